@@ -20,7 +20,9 @@ from app.background_agent.agent import background_agent
 from app.magic_agent.agent import magic_agent
 from app.stock_agent.agent import stock_agent
 from app.shared import constants
+from app.shared import session_memory
 from app import instructions
+from app.tools.session_memory_tool import get_stored_result_tool
 from app.tools.terminal_tool import terminal_tool
 
 background_agent_tool = AgentTool(agent=background_agent)
@@ -34,5 +36,14 @@ root_agent = Agent(
     model=constants.AGENT_MODEL,
     description=instructions.DESCRIPTION,
     instruction=instructions.INSTRUCTION,
-    tools=[background_agent_tool, magic_agent_tool, stock_agent_tool, terminal_tool],
+    tools=[
+        background_agent_tool,
+        magic_agent_tool,
+        stock_agent_tool,
+        terminal_tool,
+        get_stored_result_tool,
+    ],
+    before_tool_callback=session_memory.before_tool_callback,
+    after_tool_callback=session_memory.after_tool_callback,
+    before_model_callback=session_memory.before_model_callback,
 )
@@ -22,5 +22,7 @@ INSTRUCTION = (
     "such as waiting and then sending a notification, you must use the "
     "background_agent tool. If a user asks a question about Magic: The Gathering,"
     "you must use the magic_agent tool. If the user wants to send a"
-    " message use the terminal_tool."
+    " message use the terminal_tool. Tool results carry a result_handle; "
+    "older ones are summarized to save space, and get_stored_result returns "
+    "one in full again."
 )
@@ -16,13 +16,23 @@
 
 from google.adk.agents import LlmAgent
 from app.shared import constants
+from app.shared import session_memory
 from app.magic_agent import instructions
+from app.tools import price_history_tool
 from app.tools import scryfall_tool
+from app.tools import session_memory_tool
 
 magic_agent = LlmAgent(
     name="magic_agent",
     model=constants.AGENT_MODEL,
     description=instructions.DESCRIPTION,
     instruction=instructions.INSTRUCTION,
-    tools=scryfall_tool.all_scryfall_tools,
+    tools=(
+        scryfall_tool.all_scryfall_tools
+        + price_history_tool.all_price_history_tools
+        + [session_memory_tool.get_stored_result_tool]
+    ),
+    before_tool_callback=session_memory.before_tool_callback,
+    after_tool_callback=session_memory.after_tool_callback,
+    before_model_callback=session_memory.before_model_callback,
 )
@@ -0,0 +1,77 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Serves the agents from several worker processes.
+
+`adk web` and `adk api_server` run a single Python process, so CPU-bound work
+is limited to one core by the GIL. This entry point runs the same ADK FastAPI
+app under uvicorn with multiple workers. The workers share sessions, response
+caches and upstream rate limits through SQLite databases in a common cache
+directory.
+
+Run from the repository root:
+
+    python -m app.serve --workers 4 --web
+"""
+
+import argparse
+import os
+
+# The directory that contains the `app` agent package.
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_app():
+    """Builds the ADK FastAPI app for one worker process."""
+    from google.adk.cli.fast_api import get_fast_api_app
+
+    cache_dir = os.environ["ADK_SHARED_CACHE_DIR"]
+    return get_fast_api_app(
+        agents_dir=AGENTS_DIR,
+        # Sessions must be shared, as consecutive requests for a session may
+        # be handled by different workers.
+        session_service_uri="sqlite:///" + os.path.join(cache_dir, "sessions.db"),
+        web=os.environ.get("ADK_SERVE_WEB") == "1",
+    )
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="The number of worker processes (default: one per core).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-dir", default=os.path.join(AGENTS_DIR, ".adk_cache"),
+                        help="The directory for state shared by the workers.")
+    parser.add_argument("--web", action="store_true", help="Also serve the ADK web UI.")
+    args = parser.parse_args()
+
+    # Workers are started as fresh processes and read these on import.
+    os.makedirs(args.cache_dir, exist_ok=True)
+    os.environ["ADK_SHARED_CACHE_DIR"] = os.path.abspath(args.cache_dir)
+    os.environ["ADK_SERVE_WEB"] = "1" if args.web else "0"
+
+    uvicorn.run(
+        "app.serve:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
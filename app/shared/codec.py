@@ -0,0 +1,65 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""JSON encoding and decoding using the fastest available library.
+
+orjson is used when installed, then msgspec, then the standard library.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if orjson is not None:
+    BACKEND = "orjson"
+
+    def loads(content):
+        """Decodes JSON bytes or text into Python objects."""
+        return orjson.loads(content)
+
+    def dumps(obj) -> bytes:
+        """Encodes Python objects as compact UTF-8 JSON bytes."""
+        return orjson.dumps(obj)
+
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    _decoder = msgspec.json.Decoder()
+    _encoder = msgspec.json.Encoder()
+
+    def loads(content):
+        """Decodes JSON bytes or text into Python objects."""
+        return _decoder.decode(content)
+
+    def dumps(obj) -> bytes:
+        """Encodes Python objects as compact UTF-8 JSON bytes."""
+        return _encoder.encode(obj)
+
+else:
+    BACKEND = "json"
+
+    def loads(content):
+        """Decodes JSON bytes or text into Python objects."""
+        return json.loads(content)
+
+    def dumps(obj) -> bytes:
+        """Encodes Python objects as compact UTF-8 JSON bytes."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -14,4 +14,61 @@
 
 """Centralized constants for the ADK explorations project."""
 
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 AGENT_MODEL = "gemini-1.5-flash"
+
+# Total time budget, in seconds, for a single upstream call including retries.
+SCRYFALL_DEADLINE_SECONDS = 10.0
+ALPHAVANTAGE_DEADLINE_SECONDS = 15.0
+
+# Upstream quotas as (requests, period in seconds, burst) tuples. Every HTTP
+# attempt, including retries and hedged requests, must fit within all of them.
+# Scryfall asks for 50-100ms between requests, i.e. about 10 per second.
+SCRYFALL_RATE_LIMITS = ((10, 1.0, 1),)
+# AlphaVantage quotas depend on the plan; the defaults match the free tier.
+ALPHAVANTAGE_RATE_LIMITS = (
+    (int(os.environ.get("ALPHAVANTAGE_REQUESTS_PER_MINUTE", "5")), 60.0, None),
+    (int(os.environ.get("ALPHAVANTAGE_REQUESTS_PER_DAY", "25")), 86400.0, None),
+)
+
+# The total size of the upstream responses kept for fallbacks in multi-worker
+# mode, per upstream.
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("ADK_RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def shared_cache_dir():
+    """Returns the directory for state shared by worker processes, if any.
+
+    It is set by `python -m app.serve` through the ADK_SHARED_CACHE_DIR
+    environment variable and read on every call, since the tools may be
+    imported before it is set. When unset, caches and rate limits are per
+    process.
+    """
+    return os.environ.get("ADK_SHARED_CACHE_DIR")
+
+
+def card_data_dir():
+    """Returns the directory holding the local Scryfall card data.
+
+    It defaults to `.adk_data/` at the repository root and can be moved with
+    the ADK_CARD_DATA_DIR environment variable.
+    """
+    return os.environ.get("ADK_CARD_DATA_DIR", os.path.join(REPO_ROOT, ".adk_data"))
+
+# Session memory (see app.shared.session_memory). Token counts are estimates
+# of about four characters per token.
+# Identical tool calls within this many seconds are answered from the store.
+MEMO_TTL_SECONDS = 600.0
+# The tool results kept inline in each model request; older large results
+# beyond it are replaced with a summary and a handle.
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("ADK_CONTEXT_TOKEN_BUDGET", "8000"))
+# Results at most this large are never compacted.
+LARGE_RESULT_TOKENS = 500
+# The tool results stored per session, oldest evicted first.
+SESSION_MEMORY_TOKEN_BUDGET = 200000
+# The total size of the tool results shared by the workers in multi-worker
+# mode, across all sessions.
+SESSION_MEMORY_SHARED_MAX_BYTES = 256 * 1024 * 1024
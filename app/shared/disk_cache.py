@@ -0,0 +1,153 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A SQLite-backed cache that is shared by every worker process."""
+
+import os
+import sqlite3
+import threading
+import time
+
+from app.shared import constants
+from app.shared import resilience
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Opens a SQLite database in WAL mode for concurrent multi-process use.
+
+    Args:
+        path: The path to the database file. Its directory is created if it
+          does not exist.
+
+    Returns:
+        An open connection in autocommit mode.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class DiskCache:
+    """A bounded key/value store in a SQLite table, safe across processes.
+
+    It has the same get/put interface as resilience.StaleCache, so either can
+    back the tools' response caches. The table is bounded both by its number
+    of entries and by the total size of their contents, since upstream bodies
+    range from a few hundred bytes to over a megabyte. The most recently
+    written entry is always kept.
+    """
+
+    def __init__(self, path: str, table: str, max_entries: int = 1000, max_bytes: int = None):
+        self._path = path
+        self._table = table
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes or constants.RESPONSE_CACHE_MAX_BYTES
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, content BLOB NOT NULL, "
+            "updated_at REAL NOT NULL, size INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in connection.execute(f"PRAGMA table_info({table})")]
+        if "size" not in columns:
+            # Tables written before sizes were tracked.
+            connection.execute(f"ALTER TABLE {table} ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            connection.execute(f"UPDATE {table} SET size = length(content)")
+        connection.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_updated_at ON {table} (updated_at)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared between threads.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = connect(self._path)
+        return connection
+
+    def get(self, key: str):
+        row = self._connection().execute(
+            f"SELECT content FROM {self._table} WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, content: bytes) -> None:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, content, updated_at, size) "
+                "VALUES (?, ?, ?, ?)",
+                (key, content, time.time(), len(content)),
+            )
+            # Trimming in the same transaction keeps the table within its
+            # bounds no matter how many workers write to it.
+            connection.execute(
+                f"DELETE FROM {self._table} WHERE key IN (SELECT key FROM (SELECT key, "
+                "ROW_NUMBER() OVER newest AS position, SUM(size) OVER newest AS total "
+                f"FROM {self._table} WINDOW newest AS (ORDER BY updated_at DESC, rowid DESC "
+                "ROWS UNBOUNDED PRECEDING)) WHERE position > 1 AND (position > ? OR total > ?))",
+                (self._max_entries, self._max_bytes),
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+
+class ResponseCache:
+    """The response cache for an upstream, chosen when it is first used.
+
+    The shared cache directory is only known once `python -m app.serve` has
+    set it, which can be after the tools are imported, so the choice between
+    an in-process LRU and a shared DiskCache is deferred to the first call.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._cache = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        with self._lock:
+            if self._cache is None:
+                cache_dir = constants.shared_cache_dir()
+                if cache_dir:
+                    self._cache = DiskCache(os.path.join(cache_dir, "responses.db"), self.name)
+                else:
+                    self._cache = resilience.StaleCache()
+            return self._cache
+
+    def get(self, key: str):
+        return self._resolve().get(key)
+
+    def put(self, key: str, content: bytes) -> None:
+        self._resolve().put(key, content)
+
+
+def response_cache(name: str) -> ResponseCache:
+    """Returns the response cache for an upstream.
+
+    In multi-worker mode (when constants.shared_cache_dir() is set) the cache
+    lives in a SQLite database shared by every worker. Otherwise it is an
+    in-process LRU.
+
+    Args:
+        name: The upstream name, used as the table name (e.g., "scryfall").
+
+    Returns:
+        An object with get(key) and put(key, content) methods.
+    """
+    return ResponseCache(name)
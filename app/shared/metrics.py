@@ -0,0 +1,69 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A minimal in-process metrics registry shared by the tools."""
+
+import threading
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+
+
+def increment(name: str, key: str = "", amount: int = 1) -> None:
+    """Increments a counter.
+
+    Args:
+        name: The name of the counter (e.g., "upstream_retries").
+        key: An optional label, such as the upstream endpoint name.
+        amount: The amount to add to the counter.
+    """
+    with _lock:
+        _counters[(name, key)] = _counters.get((name, key), 0) + amount
+
+
+def set_gauge(name: str, value, key: str = "") -> None:
+    """Sets a gauge to the given value.
+
+    Args:
+        name: The name of the gauge (e.g., "circuit_breaker_state").
+        value: The current value of the gauge.
+        key: An optional label, such as the upstream endpoint name.
+    """
+    with _lock:
+        _gauges[(name, key)] = value
+
+
+def snapshot() -> dict:
+    """Returns a copy of all counters and gauges.
+
+    Returns:
+        A dictionary with "counters" and "gauges" entries, each mapping
+        "name" or "name{key}" to its current value.
+    """
+    def _label(name, key):
+        return f"{name}{{{key}}}" if key else name
+
+    with _lock:
+        return {
+            "counters": {_label(n, k): v for (n, k), v in _counters.items()},
+            "gauges": {_label(n, k): v for (n, k), v in _gauges.items()},
+        }
+
+
+def reset() -> None:
+    """Clears all counters and gauges."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
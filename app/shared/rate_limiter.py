@@ -0,0 +1,197 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Token-bucket rate limiting for upstream quotas, within or across processes.
+
+Each limit is a token bucket implemented with the generic cell rate algorithm
+(GCRA): the only state per bucket is its "theoretical arrival time", which
+makes it cheap to keep in a shared SQLite table.
+"""
+
+import os
+import threading
+import time
+
+from app.shared import constants
+from app.shared import disk_cache
+
+
+class Rate:
+    """A quota of `requests` per `period` seconds, allowing `burst` at once.
+
+    Attributes:
+        requests: The number of requests allowed per period.
+        period: The length of the period in seconds.
+        burst: The number of requests that may be sent back to back. Defaults
+          to `requests`.
+    """
+
+    def __init__(self, requests: int, period: float, burst: int = None):
+        self.requests = requests
+        self.period = period
+        self.burst = burst or requests
+
+    @property
+    def interval(self) -> float:
+        """The steady-state number of seconds between two requests."""
+        return self.period / self.requests
+
+
+def _reserve(rates, arrivals, now: float, timeout: float):
+    """Computes a reservation for one request against several buckets.
+
+    Args:
+        rates: The Rate of each bucket.
+        arrivals: The current theoretical arrival time of each bucket.
+        now: The current wall-clock time.
+        timeout: The longest the caller is willing to wait.
+
+    Returns:
+        A (wait, new_arrivals) tuple, or (None, None) if the request could not
+        be sent within `timeout`.
+    """
+    wait = 0.0
+    for rate, arrival in zip(rates, arrivals):
+        tolerance = (rate.burst - 1) * rate.interval
+        wait = max(wait, max(arrival, now) - tolerance - now)
+    if wait > timeout:
+        return None, None
+    sent_at = now + wait
+    return wait, [max(arrival, sent_at) + rate.interval for rate, arrival in zip(rates, arrivals)]
+
+
+class RateLimiter:
+    """Enforces one or more Rates within this process."""
+
+    def __init__(self, name: str, rates):
+        self.name = name
+        self.rates = list(rates)
+        self._arrivals = [0.0] * len(self.rates)
+        self._lock = threading.Lock()
+
+    def _try_reserve(self, now: float, timeout: float):
+        with self._lock:
+            wait, arrivals = _reserve(self.rates, self._arrivals, now, timeout)
+            if arrivals is not None:
+                self._arrivals = arrivals
+            return wait
+
+    def acquire(self, timeout: float = float("inf")) -> bool:
+        """Blocks until the caller may send its request.
+
+        Args:
+            timeout: The longest, in seconds, the caller is willing to wait.
+
+        Returns:
+            True once the caller may send the request, or False straight away
+            if no slot is available within `timeout`. No slot is taken in
+            that case.
+        """
+        wait = self._try_reserve(time.time(), timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+
+class SharedRateLimiter(RateLimiter):
+    """A RateLimiter whose buckets are kept in SQLite, shared by all workers."""
+
+    def __init__(self, name: str, rates, path: str):
+        super().__init__(name, rates)
+        self._path = path
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (name TEXT PRIMARY KEY, arrival REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = disk_cache.connect(self._path)
+        return connection
+
+    def _try_reserve(self, now: float, timeout: float):
+        keys = [f"{self.name}:{rate.requests}/{rate.period:g}s" for rate in self.rates]
+        connection = self._connection()
+        # BEGIN IMMEDIATE takes the write lock up front, so the reads and the
+        # updates below are atomic across processes.
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            arrivals = []
+            for key in keys:
+                row = connection.execute(
+                    "SELECT arrival FROM rate_limits WHERE name = ?", (key,)
+                ).fetchone()
+                arrivals.append(row[0] if row else 0.0)
+            wait, arrivals = _reserve(self.rates, arrivals, now, timeout)
+            if arrivals is not None:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO rate_limits (name, arrival) VALUES (?, ?)",
+                    zip(keys, arrivals),
+                )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return wait
+
+
+class UpstreamRateLimiter:
+    """The rate limiter for an upstream, chosen when it is first used.
+
+    The shared cache directory is only known once `python -m app.serve` has
+    set it, which can be after the tools are imported, so the choice between
+    a per-process and a shared limiter is deferred to the first request.
+    """
+
+    def __init__(self, name: str, rates):
+        self.name = name
+        self.rates = list(rates)
+        self._limiter = None
+        self._lock = threading.Lock()
+
+    def _resolve(self) -> RateLimiter:
+        with self._lock:
+            if self._limiter is None:
+                cache_dir = constants.shared_cache_dir()
+                if cache_dir:
+                    self._limiter = SharedRateLimiter(
+                        self.name, self.rates, os.path.join(cache_dir, "rate_limits.db")
+                    )
+                else:
+                    self._limiter = RateLimiter(self.name, self.rates)
+            return self._limiter
+
+    def acquire(self, timeout: float = float("inf")) -> bool:
+        """See RateLimiter.acquire."""
+        return self._resolve().acquire(timeout)
+
+
+def for_upstream(name: str, rates) -> UpstreamRateLimiter:
+    """Returns the rate limiter for an upstream.
+
+    In multi-worker mode (when constants.shared_cache_dir() is set) the
+    buckets are shared by every worker, so the upstream's quota is respected
+    globally. Otherwise they only apply within this process.
+
+    Args:
+        name: The upstream name (e.g., "scryfall").
+        rates: The Rates to enforce; a request must fit within all of them.
+
+    Returns:
+        An object with an acquire(timeout) method.
+    """
+    return UpstreamRateLimiter(name, rates)
@@ -0,0 +1,342 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deadlines, hedging, retries and circuit breaking for upstream API calls."""
+
+import collections
+import random
+import threading
+import time
+from concurrent import futures
+
+from app.shared import metrics
+
+# Statuses that are worth retrying: rate limiting and server-side failures.
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit breaker is open."""
+
+
+class DeadlineExceededError(Exception):
+    """Raised when an upstream call does not finish before its deadline."""
+
+
+class RateLimitedError(Exception):
+    """Raised when the upstream's quota has no slot for a request in time."""
+
+
+class UpstreamStatusError(Exception):
+    """Raised when an upstream keeps returning a retryable status."""
+
+    def __init__(self, status: int, content: bytes):
+        super().__init__(f"upstream returned status {status}")
+        self.status = status
+        self.content = content
+
+
+class EndpointPolicy:
+    """The resilience settings for one upstream endpoint.
+
+    Attributes:
+        name: The endpoint name used for metrics (e.g., "scryfall").
+        deadline: The total number of seconds a call may take, including
+          retries and hedged requests.
+        max_attempts: The maximum number of sequential attempts.
+        backoff_base: The base delay, in seconds, for exponential backoff.
+        backoff_cap: The maximum delay, in seconds, between two attempts.
+        hedge: Whether slow idempotent requests are hedged with a second
+          request. Turn it off for upstreams with a tight quota, since every
+          hedged request spends part of it.
+        hedge_min_delay: The lower bound, in seconds, for the hedging delay.
+        failure_threshold: The number of consecutive failures that opens the
+          circuit breaker.
+        reset_timeout: The number of seconds the breaker stays open before a
+          trial request is let through.
+        max_in_flight: The maximum number of HTTP requests, including hedged
+          requests, sent to the endpoint at once. Further requests wait for a
+          free slot within their deadline.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        deadline: float = 10.0,
+        max_attempts: int = 3,
+        backoff_base: float = 0.2,
+        backoff_cap: float = 2.0,
+        hedge: bool = True,
+        hedge_min_delay: float = 0.05,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_in_flight: int = 8,
+    ):
+        self.name = name
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_in_flight = max_in_flight
+
+
+class LatencyTracker:
+    """Keeps a rolling window of call latencies to estimate the p95."""
+
+    def __init__(self, window: int = 200, default: float = 1.0):
+        self._samples = collections.deque(maxlen=window)
+        self._default = default
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> float:
+        """Returns the 95th percentile latency, or the default if unknown."""
+        with self._lock:
+            if len(self._samples) < 20:
+                return self._default
+            ordered = sorted(self._samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+class CircuitBreaker:
+    """A consecutive-failure circuit breaker with a half-open trial state."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = CLOSED
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        metrics.set_gauge("circuit_breaker_state", CLOSED, key=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._reset_timeout:
+            self._set_state(HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            self._state = state
+            metrics.set_gauge("circuit_breaker_state", state, key=self.name)
+            metrics.increment("circuit_breaker_transitions", key=f"{self.name}:{state}")
+
+    def allow(self) -> bool:
+        """Returns whether a call may go through right now."""
+        with self._lock:
+            state = self._current_state()
+            if state == HALF_OPEN:
+                # Let exactly one trial request through and stay half-open
+                # until it reports back.
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+                return True
+            return state == CLOSED
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state != CLOSED or self._failures >= self._failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def release(self) -> None:
+        """Ends a call that says nothing about the upstream's health.
+
+        A half-open breaker lets its next caller make the trial instead.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Returns a "full jitter" exponential backoff delay for an attempt.
+
+    Args:
+        attempt: The zero-based number of the attempt that just failed.
+        base: The base delay in seconds.
+        cap: The maximum delay in seconds.
+
+    Returns:
+        A random delay between 0 and min(cap, base * 2 ** attempt).
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class ResilientCaller:
+    """Runs upstream calls under a deadline, hedging, retries and a breaker."""
+
+    def __init__(self, policy: EndpointPolicy, rate_limiter=None):
+        self.policy = policy
+        self.rate_limiter = rate_limiter
+        self.latency = LatencyTracker(default=policy.deadline / 4)
+        self.breaker = CircuitBreaker(policy.name, policy.failure_threshold, policy.reset_timeout)
+        # Each upstream has its own pool, so a slow upstream cannot use up the
+        # threads of another one.
+        self._executor = futures.ThreadPoolExecutor(
+            max_workers=policy.max_in_flight, thread_name_prefix=f"upstream-{policy.name}"
+        )
+
+    def call(self, fetch, idempotent: bool = True):
+        """Calls `fetch` and returns its (status, content) result.
+
+        Args:
+            fetch: A callable taking a timeout in seconds and returning a
+              (status, content) tuple for a single HTTP attempt.
+            idempotent: Whether the request may safely be sent more than once
+              concurrently. Only idempotent requests are hedged, and only if
+              the policy allows hedging.
+
+        Returns:
+            The (status, content) tuple of the first non-retryable response.
+
+        Raises:
+            CircuitOpenError: If the breaker is open.
+            DeadlineExceededError: If the deadline passes before a response.
+            RateLimitedError: If the rate limiter has no slot before the
+              deadline.
+            UpstreamStatusError: If every attempt returned a retryable status.
+            Exception: The error raised by the last attempt, if it failed
+              with a transport error.
+        """
+        name = self.policy.name
+        if not self.breaker.allow():
+            metrics.increment("circuit_breaker_rejections", key=name)
+            raise CircuitOpenError(f"{name} circuit breaker is open")
+
+        deadline = time.monotonic() + self.policy.deadline
+        last_error = None
+        for attempt in range(self.policy.max_attempts):
+            if attempt:
+                metrics.increment("upstream_retries", key=name)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                status, content = self._attempt(fetch, deadline, idempotent)
+            except RateLimitedError:
+                # Our own quota is exhausted; that says nothing about the
+                # upstream's health.
+                self.breaker.release()
+                raise
+            except Exception as e:  # pylint: disable=broad-except
+                last_error = e
+            else:
+                if status not in RETRYABLE_STATUSES:
+                    self.breaker.record_success()
+                    return status, content
+                last_error = UpstreamStatusError(status, content)
+            delay = backoff_delay(attempt, self.policy.backoff_base, self.policy.backoff_cap)
+            if time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+
+        self.breaker.record_failure()
+        metrics.increment("upstream_failures", key=name)
+        if last_error is not None and not isinstance(last_error, DeadlineExceededError):
+            raise last_error
+        raise DeadlineExceededError(f"{name} did not respond within {self.policy.deadline}s") from last_error
+
+    def _attempt(self, fetch, deadline: float, idempotent: bool):
+        """Runs one attempt, hedging it with a second request if it is slow."""
+        started = time.monotonic()
+        pending = {self._executor.submit(self._send, fetch, deadline)}
+        if idempotent and self.policy.hedge:
+            hedge_delay = min(max(self.latency.p95(), self.policy.hedge_min_delay), deadline - started)
+            done, _ = futures.wait(pending, timeout=hedge_delay)
+            if not done:
+                metrics.increment("upstream_hedged_requests", key=self.policy.name)
+                pending.add(self._executor.submit(self._send, fetch, deadline))
+
+        while pending:
+            timeout = deadline - time.monotonic()
+            done, pending = futures.wait(
+                pending, timeout=max(timeout, 0), return_when=futures.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception:  # pylint: disable=broad-except
+                    if pending:
+                        continue
+                    raise
+                self.latency.record(time.monotonic() - started)
+                return result
+        metrics.increment("upstream_timeouts", key=self.policy.name)
+        raise DeadlineExceededError(f"{self.policy.name} attempt timed out")
+
+    def _send(self, fetch, deadline: float):
+        """Sends one HTTP request once the rate limiter grants it a slot.
+
+        The request may have waited for a free thread, so its timeout is
+        taken from the deadline when it actually starts.
+        """
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            raise DeadlineExceededError(f"{self.policy.name} request expired before it was sent")
+        if self.rate_limiter is not None and not self.rate_limiter.acquire(timeout):
+            metrics.increment("upstream_rate_limited", key=self.policy.name)
+            raise RateLimitedError(f"{self.policy.name} quota has no free slot within {timeout:.1f}s")
+        return fetch(max(deadline - time.monotonic(), 0.001))
+
+
+class StaleCache:
+    """A bounded LRU of the last good response per request, for fallbacks."""
+
+    def __init__(self, max_entries: int = 256):
+        self._entries = collections.OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+            return content
+
+    def put(self, key: str, content: bytes) -> None:
+        with self._lock:
+            self._entries[key] = content
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
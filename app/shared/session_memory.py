@@ -0,0 +1,327 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Session-scoped tool result memoization and context compaction.
+
+Every tool result is stored per session under a short handle, which is added
+to the result the model sees. The store is used by three agent callbacks:
+
+*   `before_tool_callback` answers a repeated call (same tool and arguments
+    within MEMO_TTL_SECONDS) from the store. If the earlier result is still
+    in the calling agent's own session and has not been compacted, only a
+    reference to it is returned; otherwise the stored result is inlined.
+*   `after_tool_callback` stores each new result and tags it with its handle.
+*   `before_model_callback` keeps the tool results in the request within
+    CONTEXT_TOKEN_BUDGET by replacing the oldest large ones with a summary
+    and their handle, and records the context size of every model call.
+
+The agents can re-read a compacted result with the `get_stored_result` tool
+(see app.tools.session_memory_tool).
+
+Sub-agents called through AgentTool run in a fresh session that starts with
+a copy of the caller's state, so the caller's session id is kept in the state
+and used as the scope for the whole conversation. Each entry also records the
+sessions it is inlined in, since a sub-agent cannot see its caller's results.
+
+Handles are random, so they never name another result. In multi-worker mode
+(when constants.shared_cache_dir() is set) results are also written to a
+SQLite database shared by every worker, so get_stored_result works on any of
+them; memoization itself stays per worker.
+"""
+
+import collections
+import json
+import os
+import threading
+import time
+import uuid
+
+from app.shared import constants
+from app.shared import disk_cache
+from app.shared import metrics
+
+HANDLE_KEY = "result_handle"
+SCOPE_STATE_KEY = "session_memory_scope"
+
+# Tools whose results must never be replayed, because each call is expected
+# to have a fresh effect or a fresh answer.
+NOT_MEMOIZED = frozenset({"get_random_card", "wait", "print_to_terminal", "background_agent"})
+
+
+def estimate_tokens(value) -> int:
+    """Estimates the number of model tokens `value` takes once serialized."""
+    if not isinstance(value, str):
+        value = json.dumps(value, default=str, separators=(",", ":"))
+    return len(value) // 4 + 1
+
+
+def summarize(value, max_items: int = 5) -> dict:
+    """Builds a short structural summary of a tool result.
+
+    Short scalar fields are kept. Lists are reduced to their length and the
+    names of their first items, and nested dictionaries to their keys.
+
+    Args:
+        value: The tool result.
+        max_items: The maximum number of list items to name.
+
+    Returns:
+        A dictionary summarizing `value`.
+    """
+    if not isinstance(value, dict):
+        text = value if isinstance(value, str) else json.dumps(value, default=str)
+        return {"text": text[:200] + ("..." if len(text) > 200 else "")}
+    summary = {}
+    for key, item in value.items():
+        if key == HANDLE_KEY:
+            continue
+        if isinstance(item, (bool, int, float)) or (isinstance(item, str) and len(item) <= 100):
+            summary[key] = item
+        elif isinstance(item, str):
+            summary[key] = item[:100] + "..."
+        elif isinstance(item, list):
+            names = [entry.get("name") for entry in item[:max_items] if isinstance(entry, dict)]
+            summary[key] = {"count": len(item)}
+            if any(names):
+                summary[key]["first_names"] = [name for name in names if name]
+        elif isinstance(item, dict):
+            summary[key] = {"keys": list(item)[:10], "count": len(item)}
+    return summary
+
+
+class _Entry:
+    """A stored tool result."""
+
+    __slots__ = ("handle", "key", "result", "tokens", "stored_at", "inlined_in")
+
+    def __init__(self, handle: str, key: str, result, tokens: int):
+        self.handle = handle
+        self.key = key
+        self.result = result
+        self.tokens = tokens
+        self.stored_at = time.monotonic()
+        # The ids of the sessions whose conversation holds the full result.
+        self.inlined_in = set()
+
+
+class SessionStore:
+    """The tool results of one session, bounded by a token budget."""
+
+    def __init__(self, token_budget: int):
+        self._token_budget = token_budget
+        self._entries = collections.OrderedDict()
+        self._by_key = {}
+        self._tokens = 0
+        self.context_tokens = collections.deque(maxlen=100)
+
+    def put(self, key, result) -> _Entry:
+        """Stores a result, evicting the oldest ones beyond the token budget.
+
+        Args:
+            key: The memoization key, or None if the result is not replayable.
+            result: The tool result.
+
+        Returns:
+            The new entry.
+        """
+        handle = f"r{uuid.uuid4().hex[:12]}"
+        entry = _Entry(handle, key, result, estimate_tokens(result))
+        self._entries[handle] = entry
+        if key is not None:
+            self._by_key[key] = entry
+        self._tokens += entry.tokens
+        while self._tokens > self._token_budget and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._tokens -= evicted.tokens
+            if evicted.key is not None and self._by_key.get(evicted.key) is evicted:
+                del self._by_key[evicted.key]
+            metrics.increment("session_memory_evictions")
+        return entry
+
+    def get(self, handle: str):
+        return self._entries.get(handle)
+
+    def find(self, key: str, max_age: float):
+        entry = self._by_key.get(key)
+        if entry is not None and time.monotonic() - entry.stored_at <= max_age:
+            return entry
+        return None
+
+
+class SessionMemory:
+    """The SessionStores of all recent sessions."""
+
+    def __init__(self, max_sessions: int = 256, token_budget: int = None):
+        self._sessions = collections.OrderedDict()
+        self._max_sessions = max_sessions
+        self._token_budget = token_budget or constants.SESSION_MEMORY_TOKEN_BUDGET
+        # Reentrant, since the callbacks hold it while calling session().
+        self._lock = threading.RLock()
+        self._shared = None
+
+    def session(self, scope: str) -> SessionStore:
+        with self._lock:
+            store = self._sessions.get(scope)
+            if store is None:
+                store = self._sessions[scope] = SessionStore(self._token_budget)
+                while len(self._sessions) > self._max_sessions:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(scope)
+            return store
+
+    def lock(self):
+        """Returns the lock guarding every SessionStore."""
+        return self._lock
+
+    def _shared_results(self):
+        cache_dir = constants.shared_cache_dir()
+        if not cache_dir:
+            return None
+        with self._lock:
+            if self._shared is None:
+                self._shared = disk_cache.DiskCache(
+                    os.path.join(cache_dir, "session_results.db"),
+                    "session_results",
+                    max_entries=10000,
+                    max_bytes=constants.SESSION_MEMORY_SHARED_MAX_BYTES,
+                )
+            return self._shared
+
+    def share(self, scope: str, entry: _Entry) -> None:
+        """Writes an entry to the shared store, in multi-worker mode."""
+        shared = self._shared_results()
+        if shared is not None:
+            shared.put(f"{scope} {entry.handle}", json.dumps(entry.result, default=str).encode("utf-8"))
+
+    def get(self, scope: str, handle: str):
+        """Returns the stored result with the given handle, or None."""
+        with self._lock:
+            entry = self.session(scope).get(handle)
+            if entry is not None:
+                return entry.result
+        shared = self._shared_results()
+        content = shared.get(f"{scope} {handle}") if shared is not None else None
+        return json.loads(content) if content is not None else None
+
+
+memory = SessionMemory()
+
+
+def scope_of(context) -> str:
+    """Returns the conversation scope for a callback or tool context."""
+    scope = context.state.get(SCOPE_STATE_KEY)
+    if scope is None:
+        scope = context._invocation_context.session.id
+        context.state[SCOPE_STATE_KEY] = scope
+    return scope
+
+
+def _session_id(context) -> str:
+    """Returns the id of the session the agent of `context` runs in."""
+    return context._invocation_context.session.id
+
+
+def _memo_key(tool_name: str, args: dict) -> str:
+    return tool_name + " " + json.dumps(args, sort_keys=True, default=str)
+
+
+def before_tool_callback(tool, args, tool_context):
+    """Answers a repeated tool call from the session store."""
+    if tool.name in NOT_MEMOIZED:
+        return None
+    with memory.lock():
+        store = memory.session(scope_of(tool_context))
+        entry = store.find(_memo_key(tool.name, args), constants.MEMO_TTL_SECONDS)
+        if entry is None:
+            return None
+        metrics.increment("session_memory_hits", key=tool.name)
+        session_id = _session_id(tool_context)
+        if session_id not in entry.inlined_in:
+            # This agent cannot see the earlier copy: it was compacted, or it
+            # lives in another agent's session. Inline the stored result.
+            entry.inlined_in.add(session_id)
+            return dict(entry.result, **{HANDLE_KEY: entry.handle})
+        return {
+            HANDLE_KEY: entry.handle,
+            "note": "This exact call was already answered earlier in this conversation "
+                    f"(result {entry.handle}); refer to that result instead.",
+        }
+
+
+def after_tool_callback(tool, args, tool_context, tool_response):
+    """Stores a new tool result and tags it with its handle."""
+    if isinstance(tool_response, dict) and HANDLE_KEY in tool_response:
+        return None  # A replay from before_tool_callback; already stored.
+    result = tool_response if isinstance(tool_response, dict) else {"result": tool_response}
+    if "error" in result:
+        return None
+    scope = scope_of(tool_context)
+    with memory.lock():
+        store = memory.session(scope)
+        # Results of tools that are never replayed are stored for their handle only.
+        key = _memo_key(tool.name, args) if tool.name not in NOT_MEMOIZED else None
+        entry = store.put(key, result)
+        entry.inlined_in.add(_session_id(tool_context))
+    memory.share(scope, entry)
+    tagged = dict(result)
+    tagged[HANDLE_KEY] = entry.handle
+    return tagged
+
+
+def _function_responses(llm_request):
+    for content in llm_request.contents or ():
+        for part in content.parts or ():
+            function_response = getattr(part, "function_response", None)
+            if function_response is not None and isinstance(function_response.response, dict):
+                yield function_response
+
+
+def before_model_callback(callback_context, llm_request):
+    """Compacts old tool results and records the context size of the call."""
+    agent = callback_context.agent_name
+    before = estimate_tokens([content.model_dump(exclude_none=True) for content in llm_request.contents or ()])
+    session_id = _session_id(callback_context)
+    with memory.lock():
+        store = memory.session(scope_of(callback_context))
+        budget = constants.CONTEXT_TOKEN_BUDGET
+        used = 0
+        # Walk from the newest result back, keeping results until the budget
+        # is spent and compacting every large one after that.
+        for function_response in reversed(list(_function_responses(llm_request))):
+            response = function_response.response
+            handle = response.get(HANDLE_KEY)
+            tokens = estimate_tokens(response)
+            if handle is None or tokens <= constants.LARGE_RESULT_TOKENS or "compacted" in response:
+                used += tokens
+                continue
+            if used + tokens <= budget:
+                used += tokens
+                continue
+            entry = store.get(handle)
+            if entry is not None:
+                entry.inlined_in.discard(session_id)
+            function_response.response = {
+                HANDLE_KEY: handle,
+                "compacted": True,
+                "summary": summarize(response),
+                "note": f"Older result compacted to save context; call get_stored_result('{handle}') "
+                        "to read it in full.",
+            }
+            metrics.increment("session_memory_compactions", key=agent)
+            used += estimate_tokens(function_response.response)
+    after = estimate_tokens([content.model_dump(exclude_none=True) for content in llm_request.contents or ()])
+    store.context_tokens.append(after)
+    metrics.set_gauge("context_tokens", after, key=agent)
+    metrics.increment("context_tokens_saved", key=agent, amount=before - after)
+    return None
@@ -0,0 +1,195 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deduplicates concurrent identical calls so they share one result."""
+
+import asyncio
+import collections
+import json
+import threading
+import weakref
+from urllib.parse import urlencode
+
+from app.shared import metrics
+
+
+def normalize_params(params: dict) -> dict:
+    """Returns the canonical form of a request's query parameters.
+
+    Parameters are sorted, surrounding whitespace is stripped from string
+    values and None values are dropped. Build both the request URL and its
+    key from the result, so that requests sharing a key are identical.
+
+    Args:
+        params: A dictionary of query parameters, or None.
+
+    Returns:
+        A new dictionary in sorted key order.
+    """
+    return {
+        k: v.strip() if isinstance(v, str) else v
+        for k, v in sorted((params or {}).items())
+        if v is not None
+    }
+
+
+def normalize_key(*parts, params: dict = None, body=None) -> str:
+    """Builds a canonical key for a request.
+
+    Query parameters are normalized with normalize_params() and the body is
+    serialized with sorted keys, so requests that differ only in ordering or
+    padding map to the same key.
+
+    Args:
+        *parts: Leading key components, such as the method and API path.
+        params: A dictionary of query parameters.
+        body: A JSON-serializable request body.
+
+    Returns:
+        The normalized key as a string.
+    """
+    key = " ".join(str(part) for part in parts)
+    if params:
+        key += "?" + urlencode(normalize_params(params))
+    if body is not None:
+        key += " " + json.dumps(body, sort_keys=True, separators=(",", ":"))
+    return key
+
+
+class _Call:
+    """A call that is in flight and the outcome it will share."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Makes concurrent calls with the same key share a single execution.
+
+    The first caller for a key runs the function; callers that arrive while it
+    is running wait for it and receive the same result or exception. Nothing
+    is cached once the call completes.
+    """
+
+    def __init__(self, name: str, max_tracked_keys: int = 1024):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        # Futures belong to one event loop, so async calls are shared per loop.
+        # Keying on the loop itself lets a closed loop's entry go away with it.
+        self._async_calls = weakref.WeakKeyDictionary()
+        self._waiter_counts = collections.OrderedDict()
+        self._max_tracked_keys = max_tracked_keys
+
+    def do(self, key: str, fn):
+        """Runs `fn()` for `key`, or waits for an identical call in flight.
+
+        Args:
+            key: The normalized request key.
+            fn: A callable with no arguments that performs the request.
+
+        Returns:
+            The value returned by `fn`, shared by every concurrent caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            self._record_waiter(key)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key: str, fn):
+        """Awaits `fn()` for `key`, or an identical call already in flight.
+
+        Calls are shared per event loop. If the caller running the function
+        is cancelled, the callers waiting on it are not: one of them runs the
+        function instead and the others wait on it.
+
+        Args:
+            key: The normalized request key.
+            fn: A coroutine function with no arguments that performs the
+              request.
+
+        Returns:
+            The value returned by `fn`, shared by every concurrent caller.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            calls = self._async_calls.setdefault(loop, {})
+        while True:
+            future = calls.get(key)
+            if future is None:
+                break
+            self._record_waiter(key)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not future.cancelled() or (hasattr(task, "cancelling") and task.cancelling()):
+                    raise
+                # Only the leader was cancelled; elect a new one.
+                metrics.increment("single_flight_leader_cancellations", key=self.name)
+
+        future = loop.create_future()
+        calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case no one else is waiting.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if calls.get(key) is future:
+                del calls[key]
+
+    def _record_waiter(self, key: str) -> None:
+        metrics.increment("single_flight_shared_calls", key=self.name)
+        with self._lock:
+            self._waiter_counts[key] = self._waiter_counts.get(key, 0) + 1
+            self._waiter_counts.move_to_end(key)
+            while len(self._waiter_counts) > self._max_tracked_keys:
+                self._waiter_counts.popitem(last=False)
+
+    def waiter_counts(self) -> dict:
+        """Returns how many callers piggybacked on an in-flight call, per key."""
+        with self._lock:
+            return dict(self._waiter_counts)
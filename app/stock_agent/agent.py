@@ -16,7 +16,9 @@
 
 from google.adk.agents import LlmAgent
 from app.shared import constants
+from app.shared import session_memory
 from app.stock_agent import instructions
+from app.tools import session_memory_tool
 from app.tools import stock_tool
 
 stock_agent = LlmAgent(
@@ -24,5 +26,8 @@ stock_agent = LlmAgent(
     model=constants.AGENT_MODEL,
     description=instructions.DESCRIPTION,
     instruction=instructions.INSTRUCTION,
-    tools=stock_tool.all_stock_tools,
+    tools=stock_tool.all_stock_tools + [session_memory_tool.get_stored_result_tool],
+    before_tool_callback=session_memory.before_tool_callback,
+    after_tool_callback=session_memory.after_tool_callback,
+    before_model_callback=session_memory.before_model_callback,
 )
@@ -0,0 +1,210 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A local copy of the Scryfall oracle cards, built from the bulk data.
+
+The corpus is a SQLite database with one compact card record per oracle
+name, so it can be shared by every worker process. Records are a snapshot of
+the day the corpus was built and leave out prices. Build or refresh it from
+the repository root with:
+
+    python -m app.tools.card_corpus
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import urllib.request
+
+from httplib2 import Http
+from app.shared import codec
+from app.shared import constants
+from app.shared import disk_cache
+from app.tools import records
+
+BULK_DATA_URL = "https://api.scryfall.com/bulk-data/"
+
+# Oracle cards bulk data also lists tokens and art cards, which are not
+# playable cards and would only add noise to name lookups.
+_EXCLUDED_LAYOUTS = frozenset({"token", "double_faced_token", "art_series", "emblem"})
+
+# Prices change daily, so they are left out of the corpus rather than served
+# stale; app.tools.price_store records them instead.
+_EXCLUDED_FIELDS = ("prices",)
+
+
+def download_bulk_data(kind: str, path: str) -> str:
+    """Downloads a Scryfall bulk data file.
+
+    Args:
+        kind: The bulk data type (e.g., "oracle_cards", "default_cards").
+        path: Where to write the file.
+
+    Returns:
+        The `updated_at` timestamp of the downloaded file.
+    """
+    response, content = Http(timeout=30).request(
+        BULK_DATA_URL + kind,
+        headers={"User-Agent": "ADK-Explorations-Agent/1.0", "Accept": "application/json"},
+    )
+    if response.status != 200:
+        raise RuntimeError(f"Scryfall bulk data lookup returned status {response.status}")
+    metadata = codec.loads(content)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    request = urllib.request.Request(
+        metadata["download_uri"], headers={"User-Agent": "ADK-Explorations-Agent/1.0"}
+    )
+    # The files are hundreds of megabytes, so stream them to disk.
+    with urllib.request.urlopen(request) as source, open(path + ".part", "wb") as target:
+        shutil.copyfileobj(source, target)
+    os.replace(path + ".part", path)
+    return metadata["updated_at"]
+
+
+def iter_bulk_cards(path: str):
+    """Yields the card objects of a Scryfall bulk data file one at a time.
+
+    Scryfall writes one card object per line, which lets the file be read
+    without holding all of it in memory. Files in any other layout are
+    decoded in one go.
+
+    Args:
+        path: The path to the bulk data file.
+
+    Yields:
+        Card objects as dictionaries.
+    """
+    with open(path, "rb") as f:
+        first = f.readline().strip()
+        if first != b"[":
+            f.seek(0)
+            yield from codec.loads(f.read())
+            return
+        for line in f:
+            line = line.strip().rstrip(b",")
+            if line and line != b"]":
+                yield codec.loads(line)
+
+
+def corpus_path() -> str:
+    """Returns the path to the card corpus database."""
+    return os.path.join(constants.card_data_dir(), "cards.db")
+
+
+def _corpus_record(card: dict) -> bytes:
+    record = records.project_scryfall(card)
+    for field in _EXCLUDED_FIELDS:
+        record.pop(field, None)
+    return codec.dumps(record)
+
+
+def build_corpus(bulk_path: str, path: str = None, updated_at: str = None) -> int:
+    """Builds the card corpus from an oracle cards bulk data file.
+
+    Args:
+        bulk_path: The path to an "oracle_cards" bulk data file.
+        path: The corpus database to write. Defaults to corpus_path().
+        updated_at: The `updated_at` timestamp of the bulk data, recorded as
+          the date of the corpus.
+
+    Returns:
+        The number of cards in the corpus.
+    """
+    path = path or corpus_path()
+    connection = disk_cache.connect(path + ".part")
+    connection.execute("DROP TABLE IF EXISTS cards")
+    connection.execute("CREATE TABLE cards (name TEXT PRIMARY KEY, card BLOB NOT NULL)")
+    connection.execute("DROP TABLE IF EXISTS metadata")
+    connection.execute("CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    connection.execute("BEGIN")
+    if updated_at:
+        connection.execute("INSERT INTO metadata (key, value) VALUES ('updated_at', ?)", (updated_at,))
+    connection.executemany(
+        "INSERT OR REPLACE INTO cards (name, card) VALUES (?, ?)",
+        (
+            (card["name"], _corpus_record(card))
+            for card in iter_bulk_cards(bulk_path)
+            if card.get("layout") not in _EXCLUDED_LAYOUTS
+        ),
+    )
+    connection.execute("COMMIT")
+    count = connection.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+    # Fold the WAL back in so the database is a single file, then swap it in.
+    connection.execute("PRAGMA journal_mode=DELETE")
+    connection.close()
+    os.replace(path + ".part", path)
+    return count
+
+
+class CardCorpus:
+    """Read access to the card corpus database."""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = disk_cache.connect(self._path)
+        return connection
+
+    def updated_at(self):
+        """Returns the date of the Scryfall data the corpus was built from, or None."""
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM metadata WHERE key = 'updated_at'"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None  # A corpus built before the date was recorded.
+        return row[0] if row else None
+
+    def names(self) -> list:
+        """Returns the names of every card in the corpus."""
+        return [row[0] for row in self._connection().execute("SELECT name FROM cards")]
+
+    def get_card(self, name: str):
+        """Returns the card with the given oracle name, or None."""
+        row = self._connection().execute(
+            "SELECT card FROM cards WHERE name = ?", (name,)
+        ).fetchone()
+        return codec.loads(row[0]) if row else None
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus():
+    """Returns the local card corpus, or None if it has not been built."""
+    global _corpus
+    with _corpus_lock:
+        if _corpus is None:
+            path = corpus_path()
+            if not os.path.exists(path):
+                return None
+            _corpus = CardCorpus(path)
+        return _corpus
+
+
+def main():
+    bulk_path = os.path.join(constants.card_data_dir(), "oracle_cards.json")
+    updated_at = download_bulk_data("oracle_cards", bulk_path)
+    count = build_corpus(bulk_path, updated_at=updated_at)
+    print(f"Built a corpus of {count} cards from the oracle cards of {updated_at}.")
+
+
+if __name__ == "__main__":
+    main()
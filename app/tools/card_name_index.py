@@ -0,0 +1,220 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""An in-memory index of card names for autocomplete and fuzzy lookups.
+
+Names are normalized (diacritics, ligatures, punctuation and case removed)
+and every card is indexed under its full name and, for split and double-faced
+cards, under each face name. Two structures sit on top:
+
+*   Sorted prefix arrays, searched with bisect, for autocomplete: one for
+    whole names and one for the tails of names starting at each later word.
+*   A trigram index for typo-tolerant matching. Candidates are gathered
+    from the query's rarest trigrams only, which bounds the work per query,
+    and then ranked by the Dice coefficient between the trigram sets of the
+    query and of each name.
+"""
+
+import bisect
+import collections
+import re
+import threading
+import unicodedata
+
+from app.tools import card_corpus
+
+_LIGATURES = str.maketrans({"æ": "ae", "œ": "oe", "ß": "ss", "ø": "o", "đ": "d", "ł": "l"})
+_APOSTROPHES = re.compile(r"['’‘`]")
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+_FACE_SEPARATOR = " // "
+
+# The number of posting list entries a fuzzy query may scan, and the number
+# of candidates it rescores exactly.
+_POSTINGS_BUDGET = 2000
+_CANDIDATES = 20
+
+# A fuzzy match only resolves a name when it is close and clearly better than
+# the runner-up. Names missing from the corpus (tokens, new cards) otherwise
+# resolve to some unrelated card that shares a word, such as "Sol Talisman"
+# to "Sol Ring".
+RESOLVE_MIN_SCORE = 0.7
+RESOLVE_MIN_LEAD = 0.15
+
+
+def normalize(name: str) -> str:
+    """Returns the form of a name used for matching.
+
+    For example, "Jötun Grunt" becomes "jotun grunt", "Æther Vial" becomes
+    "aether vial" and "Urza's Saga" becomes "urzas saga".
+    """
+    decomposed = unicodedata.normalize("NFKD", name.casefold().translate(_LIGATURES))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    stripped = _APOSTROPHES.sub("", stripped)
+    return _NON_ALPHANUMERIC.sub(" ", stripped).strip()
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Autocomplete and fuzzy matching over a fixed list of card names."""
+
+    def __init__(self, names):
+        self.names = sorted(set(names))
+        exact = {}
+        prefixes = []
+        word_tails = []
+        postings = collections.defaultdict(list)
+        key_names = []
+        key_strings = []
+        for name_id, name in enumerate(self.names):
+            faces = name.split(_FACE_SEPARATOR)
+            keys = {normalize(name)}
+            if len(faces) > 1:
+                keys.update(normalize(face) for face in faces)
+            for key in keys:
+                if not key:
+                    continue
+                exact.setdefault(key, name_id)
+                prefixes.append((key, name_id))
+                space = key.find(" ")
+                while space != -1:
+                    word_tails.append((key[space + 1:], name_id))
+                    space = key.find(" ", space + 1)
+                key_id = len(key_names)
+                key_names.append(name_id)
+                key_strings.append(key)
+                for gram in _trigrams(key):
+                    postings[gram].append(key_id)
+        prefixes.sort()
+        word_tails.sort()
+        self._exact = exact
+        self._prefix_keys = [key for key, _ in prefixes]
+        self._prefix_ids = [name_id for _, name_id in prefixes]
+        self._tail_keys = [key for key, _ in word_tails]
+        self._tail_ids = [name_id for _, name_id in word_tails]
+        self._postings = dict(postings)
+        self._key_names = key_names
+        self._key_strings = key_strings
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, name: str):
+        """Returns the card name that `name` normalizes to exactly, or None.
+
+        A face name of a split or double-faced card resolves to the full name.
+        """
+        name_id = self._exact.get(normalize(name))
+        return self.names[name_id] if name_id is not None else None
+
+    def autocomplete(self, query: str, limit: int = 20) -> list:
+        """Returns up to `limit` names that start with `query`.
+
+        Names (or face names) starting with the query come first, then names
+        with a later word starting with it, each group in alphabetical order.
+        Like Scryfall, queries shorter than two characters match nothing.
+        """
+        key = normalize(query)
+        if len(key) < 2:
+            return []
+        found = []
+        seen = set()
+        for keys, ids in ((self._prefix_keys, self._prefix_ids), (self._tail_keys, self._tail_ids)):
+            i = bisect.bisect_left(keys, key)
+            while i < len(keys) and len(found) < limit and keys[i].startswith(key):
+                if ids[i] not in seen:
+                    seen.add(ids[i])
+                    found.append(self.names[ids[i]])
+                i += 1
+        return found
+
+    def fuzzy(self, query: str, limit: int = 5, min_score: float = 0.3) -> list:
+        """Returns the names closest to `query`, best first.
+
+        Args:
+            query: A possibly misspelled or partial card name.
+            limit: The maximum number of matches to return.
+            min_score: The minimum Dice coefficient for a match.
+
+        Returns:
+            A list of (name, score) tuples, where a score of 1.0 means the
+            trigram sets are identical.
+        """
+        key = normalize(query)
+        if not key:
+            return []
+        grams = _trigrams(key)
+        # Common trigrams ("the", " of") match a large share of all names but
+        # say little about which name is meant, so gather candidates from the
+        # rarest trigrams first and stop once the budget is spent.
+        lists = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        shared = collections.Counter()
+        scanned = 0
+        for i, postings in enumerate(lists):
+            if i >= 3 and scanned + len(postings) > _POSTINGS_BUDGET:
+                break
+            shared.update(postings)
+            scanned += len(postings)
+        best = {}
+        for key_id, _ in shared.most_common(_CANDIDATES):
+            candidate = _trigrams(self._key_strings[key_id])
+            score = 2 * len(grams & candidate) / (len(grams) + len(candidate))
+            name_id = self._key_names[key_id]
+            if score >= min_score and score > best.get(name_id, 0):
+                best[name_id] = score
+        ranked = sorted(best.items(), key=lambda item: (-item[1], len(self.names[item[0]])))
+        return [(self.names[name_id], round(score, 3)) for name_id, score in ranked[:limit]]
+
+    def resolve(self, name: str):
+        """Returns the card name best matching `name`, or None.
+
+        Exact matches win, then a unique prefix match, then a fuzzy match
+        scoring at least RESOLVE_MIN_SCORE and RESOLVE_MIN_LEAD ahead of the
+        next best name. Anything less certain returns None, so the caller can
+        ask Scryfall instead of answering with the wrong card.
+        """
+        exact = self.lookup(name)
+        if exact is not None:
+            return exact
+        completions = self.autocomplete(name, limit=2)
+        if len(completions) == 1:
+            return completions[0]
+        matches = self.fuzzy(name, limit=2)
+        if not matches or matches[0][1] < RESOLVE_MIN_SCORE:
+            return None
+        runner_up = matches[1][1] if len(matches) > 1 else 0.0
+        return matches[0][0] if matches[0][1] - runner_up >= RESOLVE_MIN_LEAD else None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Returns the name index over the local card corpus.
+
+    The index is built on first use. Returns None if the corpus has not been
+    built (see app.tools.card_corpus).
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            corpus = card_corpus.get_corpus()
+            if corpus is None:
+                return None
+            _index = NameIndex(corpus.names())
+        return _index
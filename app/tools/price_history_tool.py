@@ -0,0 +1,121 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Tools for querying the recorded history of Scryfall card prices."""
+
+from typing import Optional
+from google.adk.tools import FunctionTool
+from app.tools import card_name_index
+from app.tools import price_store
+
+
+def _check_currency(currency: str):
+    if currency not in price_store.CURRENCIES:
+        return {"error": f"Unknown currency {currency}; use one of {', '.join(price_store.CURRENCIES)}."}
+    return None
+
+
+def get_price_movers(
+    currency: str = "usd",
+    days: int = 7,
+    set_code: Optional[str] = None,
+    falling: bool = False,
+    min_price: float = 1.0,
+    limit: int = 20,
+) -> dict:
+    """Finds the cards whose price rose (or fell) the most recently.
+
+    Args:
+        currency: One of "usd", "usd_foil", "eur" or "tix".
+        days: The number of days to look back.
+        set_code: If given, only cards from this set are considered.
+        falling: If true, returns the biggest drops instead of the biggest
+          rises.
+        min_price: Cards cheaper than this at the start of the period are
+          ignored.
+        limit: The maximum number of cards to return.
+
+    Returns:
+        A dictionary with the compared dates and a list of cards with their
+        old price, new price and percentage change.
+    """
+    error = _check_currency(currency)
+    if error:
+        return error
+    return price_store.get_store().top_movers(
+        currency=currency, days=days, set_code=set_code, limit=limit,
+        min_price=min_price, falling=falling,
+    )
+
+get_price_movers_tool = FunctionTool(
+    func=get_price_movers,
+)
+
+def get_set_price_summary(set_code: str, currency: str = "usd", days: int = 7) -> dict:
+    """Summarizes the prices of the cards in a set.
+
+    Args:
+        set_code: The set code.
+        currency: One of "usd", "usd_foil", "eur" or "tix".
+        days: The number of days to compare the total value against.
+
+    Returns:
+        A dictionary with the number of priced cards, their total, mean and
+        median price, the most expensive card, and the change in total value
+        over the period.
+    """
+    error = _check_currency(currency)
+    if error:
+        return error
+    return price_store.get_store().set_summary(set_code, currency=currency, days=days)
+
+get_set_price_summary_tool = FunctionTool(
+    func=get_set_price_summary,
+)
+
+def get_card_price_history(name: str, currency: str = "usd") -> dict:
+    """Gets the daily price history of every printing of a card.
+
+    Args:
+        name: The name of the card. Misspellings are tolerated when the local
+          card corpus has been built and the intended card is clear; otherwise
+          the closest names are returned as suggestions.
+        currency: One of "usd", "usd_foil", "eur" or "tix".
+
+    Returns:
+        A dictionary with the snapshot dates and, for each printing, its
+        prices on those dates.
+    """
+    error = _check_currency(currency)
+    if error:
+        return error
+    index = card_name_index.get_index()
+    resolved = index.resolve(name) if index is not None else None
+    result = price_store.get_store().card_series(resolved or name, currency=currency)
+    if "error" in result and resolved is None and index is not None:
+        suggestions = [match for match, _ in index.fuzzy(name, limit=3)]
+        if suggestions:
+            result["suggestions"] = suggestions
+    return result
+
+get_card_price_history_tool = FunctionTool(
+    func=get_card_price_history,
+)
+
+all_price_history_tools = [
+    get_price_movers_tool,
+    get_set_price_summary_tool,
+    get_card_price_history_tool,
+]
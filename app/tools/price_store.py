@@ -0,0 +1,444 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""An append-only columnar store of daily Scryfall card prices.
+
+The store is a directory with:
+
+*   `cards.tsv`: one line per card printing (Scryfall ID, set code, collector
+    number and name). Lines are only ever appended, so a card's line number
+    is its row in every price column.
+*   `<YYYY-MM-DD>/<currency>.f32`: one column per snapshot date and currency,
+    holding a little-endian float32 price per row, NaN where there is none.
+    Columns written before a card was first seen are simply shorter.
+
+Record today's prices from the repository root with:
+
+    python -m app.tools.price_store
+
+numpy is used for the queries when it is installed; otherwise they fall back
+to the standard library `array` module.
+"""
+
+import array
+import datetime
+import heapq
+import math
+import os
+import re
+import shutil
+import struct
+import sys
+import threading
+
+from app.shared import constants
+from app.tools import card_corpus
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CURRENCIES = ("usd", "usd_foil", "eur", "tix")
+
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class CardRow:
+    """The identity of one card printing in the store."""
+
+    __slots__ = ("id", "set", "collector_number", "name")
+
+    def __init__(self, card_id: str, set_code: str, collector_number: str, name: str):
+        self.id = card_id
+        self.set = set_code
+        self.collector_number = collector_number
+        self.name = name
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "set": self.set,
+            "collector_number": self.collector_number,
+        }
+
+
+def _read_column(path: str, rows: int):
+    """Reads a price column, padded with NaN up to `rows` entries."""
+    if numpy is not None:
+        column = numpy.fromfile(path, dtype="<f4") if os.path.exists(path) else numpy.empty(0, "<f4")
+        if len(column) < rows:
+            column = numpy.concatenate([column, numpy.full(rows - len(column), numpy.nan, "<f4")])
+        return column
+    column = array.array("f")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            column.frombytes(f.read())
+        if sys.byteorder == "big":
+            column.byteswap()
+    if len(column) < rows:
+        column.extend([math.nan] * (rows - len(column)))
+    return column
+
+
+def _read_rows(path: str, rows: list):
+    """Reads the prices of some rows of a column, NaN where there is none.
+
+    Only the requested rows are read: numpy memory-maps the column and the
+    fallback seeks to each row, so a query about a few cards does not load
+    every column in full.
+    """
+    size = os.path.getsize(path) // 4 if os.path.exists(path) else 0
+    if numpy is not None:
+        rows = numpy.asarray(rows, dtype=numpy.int64)
+        values = numpy.full(len(rows), numpy.nan, "<f4")
+        present = rows < size
+        if present.any():
+            column = numpy.memmap(path, dtype="<f4", mode="r", shape=(size,))
+            values[present] = column[rows[present]]
+        return values
+    values = array.array("f", [math.nan] * len(rows))
+    if size:
+        with open(path, "rb") as f:
+            for i, row in enumerate(rows):
+                if row < size:
+                    f.seek(row * 4)
+                    values[i] = struct.unpack("<f", f.read(4))[0]
+    return values
+
+
+def _price_stats(values):
+    """Returns the count, total, median and argmax of the priced values.
+
+    Args:
+        values: Prices as read by _read_rows, NaN where there is none.
+
+    Returns:
+        A (count, total, median, index of the highest price) tuple, or None
+        if no value is priced.
+    """
+    if numpy is not None:
+        priced = numpy.nonzero(numpy.isfinite(values))[0]
+        if not len(priced):
+            return None
+        prices = values[priced].astype(numpy.float64)
+        middle = len(prices) // 2
+        return (len(prices), float(prices.sum()), float(numpy.partition(prices, middle)[middle]),
+                int(priced[numpy.argmax(prices)]))
+    priced = [i for i, value in enumerate(values) if value == value]
+    if not priced:
+        return None
+    prices = sorted(values[i] for i in priced)
+    top = max(priced, key=values.__getitem__)
+    return len(prices), math.fsum(prices), prices[len(prices) // 2], top
+
+
+def _top_changes(old, new, min_price: float, limit: int, falling: bool):
+    """Returns the rows with the largest percentage price changes.
+
+    Args:
+        old: The price column at the start of the period.
+        new: The price column at the end of the period.
+        min_price: Rows priced below this at the start are ignored. Rows
+          without a positive starting price are always ignored.
+        limit: The maximum number of rows to return.
+        falling: If true, returns the largest drops instead of rises.
+
+    Returns:
+        A list of (row, old price, new price, percent change) tuples, ordered
+        by percentage change.
+    """
+    if numpy is not None:
+        with numpy.errstate(invalid="ignore"):
+            valid = numpy.isfinite(new) & (old >= min_price) & (old > 0)
+        candidates = numpy.nonzero(valid)[0]
+        percent = (new[candidates] - old[candidates]) / old[candidates] * 100
+        order = numpy.argsort(percent if falling else -percent, kind="stable")[:limit]
+        return [
+            (int(candidates[i]), float(old[candidates[i]]), float(new[candidates[i]]), float(percent[i]))
+            for i in order
+        ]
+    changes = (
+        (row, old[row], new[row], (new[row] - old[row]) / old[row] * 100)
+        for row in range(len(old))
+        if old[row] >= min_price and old[row] > 0 and new[row] == new[row]
+    )
+    select = heapq.nsmallest if falling else heapq.nlargest
+    return select(limit, changes, key=lambda change: change[3])
+
+
+class PriceStore:
+    """Reads and appends daily price snapshots in a store directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._rows = []
+        self._row_ids = {}
+        self._rows_by_set = {}
+        self._rows_by_name = {}
+        self._registry_size = 0
+
+    def _registry_path(self) -> str:
+        return os.path.join(self.path, "cards.tsv")
+
+    def _refresh(self) -> None:
+        """Loads registry lines appended since the last call."""
+        path = self._registry_path()
+        if not os.path.exists(path) or os.path.getsize(path) == self._registry_size:
+            return
+        with open(path, "rb") as f:
+            f.seek(self._registry_size)
+            data = f.read()
+        # Ignore a trailing partial line that a running snapshot is writing.
+        data = data[:data.rfind(b"\n") + 1]
+        for line in data.decode("utf-8").splitlines():
+            self._add_row(CardRow(*line.split("\t")))
+        self._registry_size += len(data)
+
+    def _add_row(self, card_row: CardRow) -> int:
+        row = len(self._rows)
+        self._rows.append(card_row)
+        self._row_ids[card_row.id] = row
+        self._rows_by_set.setdefault(card_row.set, []).append(row)
+        self._rows_by_name.setdefault(card_row.name, []).append(row)
+        return row
+
+    def dates(self) -> list:
+        """Returns the snapshot dates in the store, oldest first."""
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name for name in os.listdir(self.path) if _DATE.match(name))
+
+    def append_snapshot(self, date: str, cards) -> int:
+        """Records the prices of `cards` as the snapshot for `date`.
+
+        Args:
+            date: The snapshot date as YYYY-MM-DD.
+            cards: Scryfall card objects, such as those of the "default_cards"
+              bulk data.
+
+        Returns:
+            The number of cards with at least one price.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock:
+            self._refresh()
+            columns = {currency: {} for currency in CURRENCIES}
+            new_rows = []
+            priced = 0
+            for card in cards:
+                prices = card.get("prices") or {}
+                if not any(prices.get(currency) for currency in CURRENCIES):
+                    continue
+                priced += 1
+                row = self._row_ids.get(card["id"])
+                if row is None:
+                    card_row = CardRow(card["id"], card["set"], card["collector_number"], card["name"])
+                    row = self._add_row(card_row)
+                    new_rows.append(card_row)
+                for currency in CURRENCIES:
+                    if prices.get(currency):
+                        columns[currency][row] = float(prices[currency])
+
+            with open(self._registry_path(), "ab") as f:
+                data = "".join(
+                    f"{row.id}\t{row.set}\t{row.collector_number}\t{row.name}\n" for row in new_rows
+                ).encode("utf-8")
+                f.write(data)
+            self._registry_size += len(data)
+
+            # Write the columns next to the final directory and move them into
+            # place together, so readers never see a partial snapshot.
+            date_dir = os.path.join(self.path, date)
+            staging_dir = date_dir + ".part"
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            os.makedirs(staging_dir)
+            for currency, values in columns.items():
+                column = array.array("f", [math.nan]) * len(self._rows)
+                for row, value in values.items():
+                    column[row] = value
+                if sys.byteorder == "big":
+                    column.byteswap()
+                with open(os.path.join(staging_dir, currency + ".f32"), "wb") as f:
+                    column.tofile(f)
+            shutil.rmtree(date_dir, ignore_errors=True)
+            os.replace(staging_dir, date_dir)
+            return priced
+
+    def _column_path(self, date: str, currency: str) -> str:
+        return os.path.join(self.path, date, currency + ".f32")
+
+    def _column(self, date: str, currency: str):
+        return _read_column(self._column_path(date, currency), len(self._rows))
+
+    def _date_before(self, dates: list, date: str, days: int):
+        """Returns the latest snapshot date at least `days` before `date`."""
+        target = (datetime.date.fromisoformat(date) - datetime.timedelta(days=days)).isoformat()
+        earlier = [d for d in dates if d <= target]
+        return earlier[-1] if earlier else None
+
+    def top_movers(self, currency: str = "usd", days: int = 7, set_code: str = None,
+                   limit: int = 20, min_price: float = 1.0, falling: bool = False) -> dict:
+        """Returns the cards whose price changed the most over `days` days.
+
+        Args:
+            currency: One of CURRENCIES.
+            days: How far back to compare the latest snapshot against.
+            set_code: If given, only cards from this set are considered.
+            limit: The maximum number of cards to return.
+            min_price: Cards cheaper than this at the start are ignored, as
+              their percentage changes are mostly noise.
+            falling: If true, returns the biggest drops instead of rises.
+
+        Returns:
+            A dictionary with the compared dates and a "cards" list of
+            movers, ordered by percentage change.
+        """
+        with self._lock:
+            self._refresh()
+            dates = self.dates()
+            if not dates:
+                return {"error": "No price snapshots have been recorded yet."}
+            end = dates[-1]
+            start = self._date_before(dates, end, days)
+            if start is None:
+                return {"error": f"No snapshot from {days} or more days before {end}; "
+                                 f"the oldest is {dates[0]}."}
+            if set_code:
+                # Only the set's rows are read, and mapped back afterwards.
+                rows = self._rows_by_set.get(set_code.lower(), [])
+                changes = [
+                    (rows[i], before, after, percent)
+                    for i, before, after, percent in _top_changes(
+                        _read_rows(self._column_path(start, currency), rows),
+                        _read_rows(self._column_path(end, currency), rows),
+                        min_price, limit, falling,
+                    )
+                ]
+            else:
+                changes = _top_changes(
+                    self._column(start, currency), self._column(end, currency),
+                    min_price, limit, falling,
+                )
+            cards = []
+            for row, before, after, percent in changes:
+                card = self._rows[row].to_dict()
+                card.update({"from": round(before, 2), "to": round(after, 2),
+                             "change_percent": round(percent, 1)})
+                cards.append(card)
+            return {"currency": currency, "from_date": start, "to_date": end, "cards": cards}
+
+    def set_summary(self, set_code: str, currency: str = "usd", days: int = 7) -> dict:
+        """Returns aggregate prices for a set and their change over `days`.
+
+        Args:
+            set_code: The set code.
+            currency: One of CURRENCIES.
+            days: How far back to compare the latest snapshot against.
+
+        Returns:
+            A dictionary with the number of priced cards, the total, mean,
+            median and most expensive card on the latest date, and the change
+            in total value since the earlier date if there is one.
+        """
+        with self._lock:
+            self._refresh()
+            dates = self.dates()
+            if not dates:
+                return {"error": "No price snapshots have been recorded yet."}
+            set_code = set_code.lower()
+            rows = self._rows_by_set.get(set_code, [])
+            if not rows:
+                return {"error": f"No cards from set {set_code} have been recorded."}
+            end = dates[-1]
+            start = self._date_before(dates, end, days)
+
+            latest = _read_rows(self._column_path(end, currency), rows)
+            stats = _price_stats(latest)
+            if stats is None:
+                return {"error": f"No {currency} prices for set {set_code} on {end}."}
+            count, total, median, top = stats
+            summary = {
+                "set": set_code,
+                "currency": currency,
+                "date": end,
+                "priced_cards": count,
+                "total": round(total, 2),
+                "mean": round(total / count, 2),
+                "median": round(median, 2),
+                "most_expensive": dict(self._rows[rows[top]].to_dict(), price=round(float(latest[top]), 2)),
+            }
+            if start is not None:
+                earlier = _price_stats(_read_rows(self._column_path(start, currency), rows))
+                summary["from_date"] = start
+                summary["total_change"] = round(total - (earlier[1] if earlier else 0.0), 2)
+            return summary
+
+    def card_series(self, name: str, currency: str = "usd") -> dict:
+        """Returns the price history of every printing of a card.
+
+        Args:
+            name: The exact card name.
+            currency: One of CURRENCIES.
+
+        Returns:
+            A dictionary with the snapshot dates and, per printing, its
+            prices on those dates (None where it had no price).
+        """
+        with self._lock:
+            self._refresh()
+            dates = self.dates()
+            rows = self._rows_by_name.get(name, [])
+            if not rows:
+                return {"error": f"No prices have been recorded for {name}."}
+            columns = [_read_rows(self._column_path(date, currency), rows) for date in dates]
+            printings = []
+            for i, row in enumerate(rows):
+                prices = [column[i] for column in columns]
+                printing = self._rows[row].to_dict()
+                printing["prices"] = [round(float(p), 2) if p == p else None for p in prices]
+                printings.append(printing)
+            return {"name": name, "currency": currency, "dates": dates, "printings": printings}
+
+
+def store_path() -> str:
+    """Returns the path to the price store directory."""
+    return os.path.join(constants.card_data_dir(), "prices")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> PriceStore:
+    """Returns the shared PriceStore for the local card data directory."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PriceStore(store_path())
+        return _store
+
+
+def main():
+    bulk_path = os.path.join(constants.card_data_dir(), "default_cards.json")
+    updated_at = card_corpus.download_bulk_data("default_cards", bulk_path)
+    date = updated_at[:10]
+    priced = get_store().append_snapshot(date, card_corpus.iter_bulk_cards(bulk_path))
+    print(f"Recorded prices for {priced} cards on {date}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compact typed records for the data returned by the tools.
+
+Upstream payloads carry many fields the agents never use (image URLs in six
+sizes, print and frame metadata, purchase links, per-field labels).
+Projecting them onto these slotted records right after decoding keeps the
+dictionaries handed back to the model small.
+"""
+
+
+# The fields of an AlphaVantage daily adjusted bar as (name, label, type)
+# tuples. AlphaVantage labels each value with a numbered prefix (e.g.,
+# "1. open").
+ALPHA_VANTAGE_FIELDS = (
+    ("open", "1. open", float),
+    ("high", "2. high", float),
+    ("low", "3. low", float),
+    ("close", "4. close", float),
+    ("adjusted_close", "5. adjusted close", float),
+    ("volume", "6. volume", int),
+    ("dividend_amount", "7. dividend amount", float),
+    ("split_coefficient", "8. split coefficient", float),
+)
+
+
+class Card:
+    """A Magic: The Gathering card, as returned by Scryfall."""
+
+    __slots__ = (
+        "id",
+        "oracle_id",
+        "multiverse_ids",
+        "mtgo_id",
+        "arena_id",
+        "tcgplayer_id",
+        "cardmarket_id",
+        "name",
+        "layout",
+        "mana_cost",
+        "cmc",
+        "type_line",
+        "oracle_text",
+        "power",
+        "toughness",
+        "loyalty",
+        "colors",
+        "color_identity",
+        "keywords",
+        "produced_mana",
+        "legalities",
+        "card_faces",
+        "set",
+        "set_name",
+        "collector_number",
+        "rarity",
+        "released_at",
+        "artist",
+        "flavor_text",
+        "prices",
+        "image_uris",
+        "scryfall_uri",
+    )
+
+    _FACE_FIELDS = (
+        "name",
+        "mana_cost",
+        "type_line",
+        "oracle_text",
+        "colors",
+        "power",
+        "toughness",
+        "loyalty",
+        "flavor_text",
+    )
+    # Scryfall links six sizes of each image; the normal one is enough to
+    # show the card.
+    _IMAGE_SIZE = "normal"
+
+    @classmethod
+    def _images(cls, image_uris):
+        if not image_uris or cls._IMAGE_SIZE not in image_uris:
+            return None
+        return {cls._IMAGE_SIZE: image_uris[cls._IMAGE_SIZE]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Card":
+        """Builds a card from a Scryfall card object."""
+        card = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(card, name, data.get(name))
+        card.image_uris = cls._images(card.image_uris)
+        faces = data.get("card_faces")
+        if faces:
+            card.card_faces = []
+            for face in faces:
+                projected = {k: face[k] for k in cls._FACE_FIELDS if face.get(k) is not None}
+                images = cls._images(face.get("image_uris"))
+                if images:
+                    projected["image_uris"] = images
+                card.card_faces.append(projected)
+        return card
+
+    def to_dict(self) -> dict:
+        """Returns the card as a dictionary, omitting empty fields."""
+        result = {"object": "card"}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = value
+        return result
+
+
+class Set:
+    """A Magic: The Gathering set, as returned by Scryfall."""
+
+    __slots__ = (
+        "id",
+        "code",
+        "name",
+        "set_type",
+        "released_at",
+        "card_count",
+        "parent_set_code",
+        "digital",
+        "scryfall_uri",
+    )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Set":
+        """Builds a set from a Scryfall set object."""
+        card_set = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(card_set, name, data.get(name))
+        return card_set
+
+    def to_dict(self) -> dict:
+        """Returns the set as a dictionary, omitting empty fields."""
+        result = {"object": "set"}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = value
+        return result
+
+
+def project_scryfall(payload: dict) -> dict:
+    """Projects a decoded Scryfall response onto compact records.
+
+    Scryfall objects are self-describing through their "object" field, so
+    cards, sets and lists of either are projected; anything else (catalogs,
+    errors) is returned unchanged.
+
+    Args:
+        payload: The decoded JSON response.
+
+    Returns:
+        The projected response as a dictionary.
+    """
+    kind = payload.get("object")
+    if kind == "card":
+        return Card.from_dict(payload).to_dict()
+    if kind == "set":
+        return Set.from_dict(payload).to_dict()
+    if kind == "list":
+        result = {k: v for k, v in payload.items() if k != "data"}
+        result["data"] = [project_scryfall(item) for item in payload.get("data", ())]
+        return result
+    return payload
+
+
+TIME_SERIES_KEY = "Time Series (Daily)"
+
+
+def project_time_series(payload: dict) -> dict:
+    """Projects a decoded AlphaVantage daily time series onto columns.
+
+    The per-day objects are replaced by one array per field, which removes the
+    repeated labels from the response.
+
+    Args:
+        payload: The decoded JSON response.
+
+    Returns:
+        A dictionary with the response metadata and a "bars" entry mapping
+        "date" and each field of ALPHA_VANTAGE_FIELDS to a list of values,
+        oldest first. Payloads without a
+        time series (such as errors or rate-limit notes) are returned
+        unchanged.
+    """
+    if TIME_SERIES_KEY not in payload:
+        return payload
+    series = payload[TIME_SERIES_KEY]
+    dates = sorted(series)
+    rows = [series[date] for date in dates]
+    columns = {"date": dates}
+    for name, label, convert in ALPHA_VANTAGE_FIELDS:
+        try:
+            columns[name] = [convert(row[label]) for row in rows]
+        except KeyError:
+            # Some rows lack the field; only then pay for the per-value check.
+            columns[name] = [convert(row[label]) if row.get(label) is not None else None for row in rows]
+    result = {k: v for k, v in payload.items() if k != TIME_SERIES_KEY}
+    result["bars"] = columns
+    return result
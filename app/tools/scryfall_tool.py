@@ -14,17 +14,43 @@
 
 """A tool for interacting with the Scryfall API."""
 
-import time
 from httplib2 import Http
 import json
 from urllib.parse import urlencode
 from google.adk.tools import FunctionTool
+from app.shared import codec
+from app.shared import constants
+from app.shared import disk_cache
+from app.shared import metrics
+from app.shared import rate_limiter
+from app.shared import resilience
+from app.shared import single_flight
+from app.tools import card_corpus
+from app.tools import card_name_index
+from app.tools import records
 
 BASE_URL = "https://api.scryfall.com"
 
+_caller = resilience.ResilientCaller(
+    resilience.EndpointPolicy("scryfall", deadline=constants.SCRYFALL_DEADLINE_SECONDS),
+    rate_limiter=rate_limiter.for_upstream(
+        "scryfall", [rate_limiter.Rate(*limit) for limit in constants.SCRYFALL_RATE_LIMITS]
+    ),
+)
+_stale_cache = disk_cache.response_cache("scryfall")
+_flight = single_flight.SingleFlight("scryfall")
+
 def _scryfall_request(api_path: str, method: str = "GET", params: dict = None, body: dict = None) -> dict:
     """Makes a request to the Scryfall API and returns the JSON response.
 
+    GET requests are hedged and retried within a deadline. While Scryfall is
+    unhealthy or keeps returning a retryable status, the last good response
+    for the same request is served instead.
+    Every HTTP attempt, including retries and hedged requests, takes a slot
+    from the Scryfall rate limit, which is shared by all workers in
+    multi-worker mode. Concurrent identical requests share a single upstream
+    fetch. Cards and sets in the response are projected onto compact records.
+
     Args:
         api_path: The API path to request (e.g., "/cards/random").
         method: The HTTP method to use (e.g., "GET", "POST").
@@ -34,7 +60,7 @@ def _scryfall_request(api_path: str, method: str = "GET", params: dict = None, b
     Returns:
         A dictionary containing the JSON response from the API.
     """
-    http_obj = Http()
+    params = single_flight.normalize_params(params)
     url = BASE_URL + api_path
     if params:
         url += "?" + urlencode(params)
@@ -46,21 +72,36 @@ def _scryfall_request(api_path: str, method: str = "GET", params: dict = None, b
     }
 
     request_body = json.dumps(body) if body else None
+    cache_key = single_flight.normalize_key(method, api_path, params=params, body=body)
 
-    try:
-        # Scryfall API asks for a 50-100ms delay between requests.
-        time.sleep(0.1)
-        response, content = http_obj.request(
+    def fetch(timeout: float):
+        response, content = Http(timeout=timeout).request(
             uri=url,
             method=method,
             headers=headers,
             body=request_body,
         )
+        return response.status, content
 
-        if response.status == 200:
-            return json.loads(content)
+    try:
+        try:
+            status, content = _flight.do(cache_key, lambda: _caller.call(fetch, idempotent=method == "GET"))
+        except Exception as e:
+            stale = _stale_cache.get(cache_key)
+            if stale is None:
+                if isinstance(e, resilience.UpstreamStatusError):
+                    return {"error": f"Scryfall API returned status {e.status}", "details": codec.loads(e.content)}
+                raise
+            metrics.increment("stale_responses_served", key="scryfall")
+            result = records.project_scryfall(codec.loads(stale))
+            result["warning"] = f"Scryfall is unavailable ({e}); this is a cached response."
+            return result
+
+        if status == 200:
+            _stale_cache.put(cache_key, content)
+            return records.project_scryfall(codec.loads(content))
         else:
-            return {"error": f"Scryfall API returned status {response.status}", "details": json.loads(content)}
+            return {"error": f"Scryfall API returned status {status}", "details": codec.loads(content)}
     except Exception as e:
         return {"error": f"An unexpected error occurred: {e}"}
 
@@ -72,7 +113,8 @@ def search_cards(query: str) -> dict:
           more details.
 
     Returns:
-        A dictionary containing the search results.
+        A dictionary containing the search results, with the matching cards
+        in "data". Each card has the fields described in get_card_by_id.
     """
     return _scryfall_request("/cards/search", params={"q": query})
 
@@ -83,14 +125,34 @@ search_cards_tool = FunctionTool(
 def get_card_by_name(name: str, exact: bool = False) -> dict:
     """Gets a card with a specific name.
 
+    Names are resolved against the local card corpus first, which tolerates
+    typos, missing accents and punctuation, and face names of split and
+    double-faced cards. Scryfall is called for names the corpus cannot match
+    with confidence, such as tokens and cards newer than the corpus.
+
     Args:
         name: The name of the card to find.
         exact: If true, performs an exact name match. Otherwise, a fuzzy
           match is performed.
 
     Returns:
-        A dictionary containing the card data.
+        A dictionary containing the card data, with the fields described in
+        get_card_by_id. Cards from the local corpus have no prices and carry
+        a "source" note with the date of the corpus.
     """
+    index = card_name_index.get_index()
+    if index is not None:
+        resolved = index.lookup(name) if exact else index.resolve(name)
+        if resolved is not None:
+            corpus = card_corpus.get_corpus()
+            card = corpus.get_card(resolved)
+            if card is not None:
+                card["source"] = (
+                    f"Local card corpus of {corpus.updated_at() or 'unknown date'}. Prices are not "
+                    "included (use get_card_by_id for live prices), and set, rarity and image are "
+                    "those of one printing."
+                )
+                return card
     params = {"fuzzy": name}
     if exact:
         params = {"exact": name}
@@ -104,7 +166,8 @@ def get_random_card() -> dict:
     """Gets a random card.
 
     Returns:
-        A dictionary containing the card data.
+        A dictionary containing the card data, with the fields described in
+        get_card_by_id.
     """
     return _scryfall_request("/cards/random")
 
@@ -119,7 +182,16 @@ def get_card_by_id(scryfall_id: str) -> dict:
         scryfall_id: The Scryfall ID of the card to find.
 
     Returns:
-        A dictionary containing the card data.
+        A dictionary containing the card data: its Scryfall, oracle,
+        Multiverse, MTGO, Arena, TCGplayer and Cardmarket IDs, name, layout,
+        mana cost, mana value (cmc), type line, oracle text, power,
+        toughness, loyalty, colors, color identity, keywords, produced mana,
+        legalities, set, collector number, rarity, release date, artist,
+        flavor text, prices, the normal-size image URL and the Scryfall page.
+        Split and double-faced cards also have "card_faces" with each face's
+        name, mana cost, type line, oracle text, colors, power, toughness,
+        loyalty, flavor text and image. Other Scryfall fields (such as print
+        and frame details or purchase links) are left out.
     """
     return _scryfall_request(f"/cards/{scryfall_id}")
 
@@ -130,12 +202,21 @@ get_card_by_id_tool = FunctionTool(
 def autocomplete_card_name(query: str) -> dict:
     """Returns a list of up to 20 full English card names that match a given query.
 
+    Names starting with the query come first, then names with a later word
+    starting with it. The local card corpus is used when it has been built;
+    Scryfall is only called when it finds nothing.
+
     Args:
         query: The query to autocomplete.
 
     Returns:
         A dictionary containing a list of matching card names.
     """
+    index = card_name_index.get_index()
+    if index is not None:
+        names = index.autocomplete(query)
+        if names:
+            return {"object": "catalog", "total_values": len(names), "data": names}
     return _scryfall_request("/cards/autocomplete", params={"q": query})
 
 autocomplete_card_name_tool = FunctionTool(
@@ -151,7 +232,8 @@ def get_card_collection(identifiers: list[dict]) -> dict:
           for more details on the format of the identifiers.
 
     Returns:
-        A dictionary containing a list of matching cards.
+        A dictionary containing a list of matching cards. Each card has the
+        fields described in get_card_by_id.
     """
     return _scryfall_request("/cards/collection", method="POST", body={"identifiers": identifiers})
 
@@ -168,7 +250,8 @@ def get_card_by_code_and_number(code: str, number: int, lang: str = "en") -> dic
         lang: The language to return the card in.
 
     Returns:
-        A dictionary containing the card data.
+        A dictionary containing the card data, with the fields described in
+        get_card_by_id.
     """
     return _scryfall_request(f"/cards/{code}/{number}/{lang}")
 
@@ -183,7 +266,8 @@ def get_card_by_multiverse_id(multiverse_id: int) -> dict:
         multiverse_id: The Multiverse ID.
 
     Returns:
-        A dictionary containing the card data.
+        A dictionary containing the card data, with the fields described in
+        get_card_by_id.
     """
     return _scryfall_request(f"/cards/multiverse/{multiverse_id}")
 
@@ -198,7 +282,8 @@ def get_card_by_mtgo_id(mtgo_id: int) -> dict:
         mtgo_id: The MTGO ID.
 
     Returns:
-        A dictionary containing the card data.
+        A dictionary containing the card data, with the fields described in
+        get_card_by_id.
     """
     return _scryfall_request(f"/cards/mtgo/{mtgo_id}")
 
@@ -213,7 +298,8 @@ def get_card_by_arena_id(arena_id: int) -> dict:
         arena_id: The Arena ID.
 
     Returns:
-        A dictionary containing the card data.
+        A dictionary containing the card data, with the fields described in
+        get_card_by_id.
     """
     return _scryfall_request(f"/cards/arena/{arena_id}")
 
@@ -228,7 +314,8 @@ def get_card_by_tcgplayer_id(tcgplayer_id: int) -> dict:
         tcgplayer_id: The TCGplayer ID.
 
     Returns:
-        A dictionary containing the card data.
+        A dictionary containing the card data, with the fields described in
+        get_card_by_id.
     """
     return _scryfall_request(f"/cards/tcgplayer/{tcgplayer_id}")
 
@@ -243,7 +330,8 @@ def get_card_by_cardmarket_id(cardmarket_id: int) -> dict:
         cardmarket_id: The Cardmarket ID.
 
     Returns:
-        A dictionary containing the card data.
+        A dictionary containing the card data, with the fields described in
+        get_card_by_id.
     """
     return _scryfall_request(f"/cards/cardmarket/{cardmarket_id}")
 
@@ -255,7 +343,8 @@ def get_all_sets() -> dict:
     """Returns a list of all sets.
 
     Returns:
-        A dictionary containing a list of all sets.
+        A dictionary containing a list of all sets. Each set has the fields
+        described in get_set_by_code.
     """
     return _scryfall_request("/sets")
 
@@ -270,7 +359,9 @@ def get_set_by_code(code: str) -> dict:
         code: The set code.
 
     Returns:
-        A dictionary containing the set data.
+        A dictionary containing the set data: its Scryfall ID, code, name,
+        set type, release date, card count, parent set code, whether it is
+        digital-only and its Scryfall page.
     """
     return _scryfall_request(f"/sets/{code}")
 
@@ -285,7 +376,8 @@ def get_set_by_tcgplayer_id(tcgplayer_id: int) -> dict:
         tcgplayer_id: The TCGplayer ID.
 
     Returns:
-        A dictionary containing the set data.
+        A dictionary containing the set data, with the fields described in
+        get_set_by_code.
     """
     return _scryfall_request(f"/sets/tcgplayer/{tcgplayer_id}")
 
@@ -300,7 +392,8 @@ def get_set_by_id(scryfall_id: str) -> dict:
         scryfall_id: The Scryfall ID of the set.
 
     Returns:
-        A dictionary containing the set data.
+        A dictionary containing the set data, with the fields described in
+        get_set_by_code.
     """
     return _scryfall_request(f"/sets/{scryfall_id}")
 
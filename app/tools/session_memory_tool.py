@@ -0,0 +1,42 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A tool for re-reading tool results stored earlier in the session."""
+
+from google.adk.tools import FunctionTool
+from google.adk.tools import ToolContext
+from app.shared import session_memory
+
+
+def get_stored_result(handle: str, tool_context: ToolContext) -> dict:
+    """Returns a tool result stored earlier in this conversation.
+
+    Every tool result carries a `result_handle`. Older results are replaced
+    in the conversation by a short summary to save space; use this tool to
+    read one in full again.
+
+    Args:
+        handle: The `result_handle` of the result (e.g., "r5f0c9e2a41b7").
+
+    Returns:
+        The full tool result.
+    """
+    result = session_memory.memory.get(session_memory.scope_of(tool_context), handle)
+    if result is None:
+        return {"error": f"No stored result {handle}; it may have been evicted. Call the original tool again."}
+    return dict(result, **{session_memory.HANDLE_KEY: handle})
+
+get_stored_result_tool = FunctionTool(
+    func=get_stored_result,
+)
@@ -14,27 +14,72 @@
 
 """A tool for interacting with the AlphaVantage API."""
 import os
-import time
 from httplib2 import Http
-import json
 from urllib.parse import urlencode
 from google.adk.tools import FunctionTool
 from typing import Optional
+from app.shared import codec
+from app.shared import constants
+from app.shared import disk_cache
+from app.shared import metrics
+from app.shared import rate_limiter
+from app.shared import resilience
+from app.shared import single_flight
+from app.tools import records
 
 BASE_URL = "https://www.alphavantage.co/query"
 
+_caller = resilience.ResilientCaller(
+    # With a quota of a few requests per minute, a hedged request costs more
+    # than the latency it saves.
+    resilience.EndpointPolicy(
+        "alphavantage", deadline=constants.ALPHAVANTAGE_DEADLINE_SECONDS, hedge=False
+    ),
+    rate_limiter=rate_limiter.for_upstream(
+        "alphavantage", [rate_limiter.Rate(*limit) for limit in constants.ALPHAVANTAGE_RATE_LIMITS]
+    ),
+)
+_stale_cache = disk_cache.response_cache("alphavantage")
+_flight = single_flight.SingleFlight("alphavantage")
+
+# AlphaVantage reports an exhausted quota with a 200 response whose body only
+# holds a "Note" or "Information" message. Such responses are treated as this
+# status, so they are retried, served from the stale cache and never cached.
+THROTTLED_STATUS = 429
+_THROTTLE_KEYS = ("Note", "Information")
+
+
+def _is_throttled(content: bytes) -> bool:
+    # Throttling messages are tiny, so real data is never decoded twice.
+    if len(content) > 2048:
+        return False
+    try:
+        payload = codec.loads(content)
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return isinstance(payload, dict) and len(payload) == 1 and next(iter(payload)) in _THROTTLE_KEYS
+
 def _alpha_vantage_query(params: dict) -> dict:
     """Makes a request to the AlphaVantage API and returns the JSON response.
 
+    Requests are retried within a deadline but never hedged, to save quota.
+    Quota messages sent with a 200 status are retried like a 429. While
+    AlphaVantage is unhealthy or throttling, the last good response for the
+    same query is served instead. Every HTTP attempt, including retries,
+    takes a slot from the AlphaVantage quota (see
+    constants.ALPHAVANTAGE_RATE_LIMITS), which is shared by all workers in
+    multi-worker mode. Concurrent identical queries share a single upstream
+    fetch.
+
     Args:
         params: A dictionary of query parameters to include in the request.
 
     Returns:
         A dictionary containing the JSON response from the API.
     """
-    http_obj = Http()
-    params["apikey"] = os.environ.get("ALPHAVANTAGE_API_KEY")
-    url = BASE_URL + "?" + urlencode(params)
+    params = single_flight.normalize_params(params)
+    cache_key = single_flight.normalize_key("GET", params=params)
+    url = BASE_URL + "?" + urlencode(dict(params, apikey=os.environ.get("ALPHAVANTAGE_API_KEY")))
 
     headers = {
         "User-Agent": "ADK-Explorations-Agent/1.0",
@@ -42,18 +87,38 @@ def _alpha_vantage_query(params: dict) -> dict:
         "Content-Type": "application/json; charset=UTF-8",
     }
 
-    try:
-        time.sleep(0.1)
-        response, content = http_obj.request(
+    def fetch(timeout: float):
+        response, content = Http(timeout=timeout).request(
             uri=url,
             method="GET",
             headers=headers,
         )
+        if response.status == 200 and _is_throttled(content):
+            metrics.increment("upstream_throttled", key="alphavantage")
+            return THROTTLED_STATUS, content
+        return response.status, content
 
-        if response.status == 200:
-            return json.loads(content)
+    try:
+        try:
+            status, content = _flight.do(cache_key, lambda: _caller.call(fetch))
+        except Exception as e:
+            stale = _stale_cache.get(cache_key)
+            if stale is None:
+                if isinstance(e, resilience.UpstreamStatusError):
+                    if e.status == THROTTLED_STATUS:
+                        return {"error": "AlphaVantage rate limit reached", "details": codec.loads(e.content)}
+                    return {"error": f"AlphaVantage API returned status {e.status}", "details": codec.loads(e.content)}
+                raise
+            metrics.increment("stale_responses_served", key="alphavantage")
+            result = codec.loads(stale)
+            result["warning"] = f"AlphaVantage is unavailable ({e}); this is a cached response."
+            return result
+
+        if status == 200:
+            _stale_cache.put(cache_key, content)
+            return codec.loads(content)
         else:
-            return {"error": f"AlphaVantage API returned status {response.status}", "details": json.loads(content)}
+            return {"error": f"AlphaVantage API returned status {status}", "details": codec.loads(content)}
     except Exception as e:
         return {"error": f"An unexpected error occurred: {e}"}
 
@@ -64,10 +129,13 @@ def get_daily_adjusted(symbol: str) -> dict:
         symbol: The stock ticker to look up.
 
     Returns:
-        A dictionary containing the daily adjusted time series data.
+        A dictionary containing the response metadata and a "bars" entry
+        with one list per field (date, open, high, low, close,
+        adjusted_close, volume, dividend_amount, split_coefficient), oldest
+        first.
     """
     params = {"function": "TIME_SERIES_DAILY_ADJUSTED", "symbol": symbol}
-    return _alpha_vantage_query(params)
+    return records.project_time_series(_alpha_vantage_query(params))
 
 get_daily_adjusted_tool = FunctionTool(
     func=get_daily_adjusted,
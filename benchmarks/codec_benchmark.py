@@ -0,0 +1,189 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures the CPU cost of each stage of the tool response path.
+
+For each payload it reports, separately:
+
+*   decode: json.loads against app.shared.codec.loads;
+*   project: the app.tools.records projection of the decoded response;
+*   serialize: json.dumps of the full and of the projected result, as ADK
+    does for the model, and the size of each.
+
+Run from the repository root:
+
+    python -m benchmarks.codec_benchmark
+"""
+
+import json
+import time
+
+from app.shared import codec
+from app.tools import records
+
+
+def _card(i: int) -> dict:
+    return {
+        "object": "card",
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "oracle_id": f"10000000-0000-0000-0000-{i:012d}",
+        "multiverse_ids": [400000 + i],
+        "mtgo_id": 60000 + i,
+        "arena_id": 70000 + i,
+        "tcgplayer_id": 200000 + i,
+        "cardmarket_id": 300000 + i,
+        "name": f"Benchmark Card {i}",
+        "lang": "en",
+        "released_at": "2024-02-09",
+        "uri": f"https://api.scryfall.com/cards/{i}",
+        "scryfall_uri": f"https://scryfall.com/card/mkm/{i}/benchmark-card-{i}",
+        "layout": "normal",
+        "highres_image": True,
+        "image_status": "highres_scan",
+        "image_uris": {
+            size: f"https://cards.scryfall.io/{size}/front/0/0/{i}.jpg?1706239871"
+            for size in ("small", "normal", "large", "png", "art_crop", "border_crop")
+        },
+        "mana_cost": "{2}{G}{G}",
+        "cmc": 4.0,
+        "type_line": "Creature — Elf Druid",
+        "oracle_text": "When this creature enters, search your library for a basic land card, "
+        "put it onto the battlefield tapped, then shuffle.\n{T}: Add {G}.",
+        "power": "3",
+        "toughness": "3",
+        "colors": ["G"],
+        "color_identity": ["G"],
+        "keywords": [],
+        "legalities": {
+            fmt: "legal"
+            for fmt in (
+                "standard", "future", "historic", "timeless", "gladiator", "pioneer",
+                "explorer", "modern", "legacy", "pauper", "vintage", "penny", "commander",
+                "oathbreaker", "standardbrawl", "brawl", "alchemy", "paupercommander",
+                "duel", "oldschool", "premodern", "predh",
+            )
+        },
+        "games": ["paper", "arena", "mtgo"],
+        "reserved": False,
+        "foil": True,
+        "nonfoil": True,
+        "finishes": ["nonfoil", "foil"],
+        "oversized": False,
+        "promo": False,
+        "reprint": False,
+        "variation": False,
+        "set_id": "2b17794b-15c3-4796-ad6f-0887a0eceeca",
+        "set": "mkm",
+        "set_name": "Murders at Karlov Manor",
+        "set_type": "expansion",
+        "set_uri": "https://api.scryfall.com/sets/2b17794b-15c3-4796-ad6f-0887a0eceeca",
+        "set_search_uri": "https://api.scryfall.com/cards/search?order=set&q=e%3Amkm&unique=prints",
+        "scryfall_set_uri": "https://scryfall.com/sets/mkm?utm_source=api",
+        "rulings_uri": f"https://api.scryfall.com/cards/{i}/rulings",
+        "prints_search_uri": f"https://api.scryfall.com/cards/search?q=oracleid%3A{i}",
+        "collector_number": str(i),
+        "digital": False,
+        "rarity": "common",
+        "flavor_text": "The forest remembers every footstep.",
+        "card_back_id": "0aeebaf5-8c7d-4636-9e82-8c27447861f7",
+        "artist": "Benchmark Artist",
+        "artist_ids": ["a0000000-0000-0000-0000-000000000000"],
+        "illustration_id": f"20000000-0000-0000-0000-{i:012d}",
+        "border_color": "black",
+        "frame": "2015",
+        "full_art": False,
+        "textless": False,
+        "booster": True,
+        "story_spotlight": False,
+        "edhrec_rank": 1000 + i,
+        "penny_rank": 2000 + i,
+        "prices": {"usd": "0.25", "usd_foil": "0.50", "usd_etched": None, "eur": "0.20",
+                   "eur_foil": "0.45", "tix": "0.03"},
+        "related_uris": {
+            "gatherer": f"https://gatherer.wizards.com/Pages/Card/Details.aspx?multiverseid={i}",
+            "tcgplayer_infinite_articles": "https://tcgplayer.pxf.io/c/4931599/1830156/21018",
+            "tcgplayer_infinite_decks": "https://tcgplayer.pxf.io/c/4931599/1830156/21018",
+            "edhrec": f"https://edhrec.com/route/?cc=Benchmark+Card+{i}",
+        },
+        "purchase_uris": {
+            "tcgplayer": "https://tcgplayer.pxf.io/c/4931599/1830156/21018",
+            "cardmarket": "https://www.cardmarket.com/en/Magic/Products/Search",
+            "cardhoarder": "https://www.cardhoarder.com/cards/12345",
+        },
+    }
+
+
+def _search_page() -> bytes:
+    return json.dumps({
+        "object": "list",
+        "total_cards": 175,
+        "has_more": False,
+        "data": [_card(i) for i in range(175)],
+    }).encode("utf-8")
+
+
+def _time_series(days: int = 6000) -> bytes:
+    series = {}
+    for i in range(days):
+        date = f"{2000 + i // 366:04d}-{1 + (i // 31) % 12:02d}-{1 + i % 31:02d}"
+        series[date] = {
+            "1. open": "101.2500",
+            "2. high": "103.1000",
+            "3. low": "100.0100",
+            "4. close": "102.7500",
+            "5. adjusted close": "98.3312",
+            "6. volume": "1234567",
+            "7. dividend amount": "0.0000",
+            "8. split coefficient": "1.0",
+        }
+    return json.dumps({
+        "Meta Data": {"1. Information": "Daily Time Series with Splits and Dividend Events",
+                      "2. Symbol": "BENCH"},
+        "Time Series (Daily)": series,
+    }).encode("utf-8")
+
+
+def _time(fn, arg, repeat: int = 20) -> float:
+    """Returns the best CPU time of `fn(arg)` over `repeat` runs, in ms."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.process_time()
+        fn(arg)
+        best = min(best, time.process_time() - started)
+    return best * 1000
+
+
+def main() -> None:
+    cases = [
+        ("search page (175 cards)", _search_page(), records.project_scryfall),
+        ("daily time series (6000 days)", _time_series(), records.project_time_series),
+    ]
+    print(f"codec backend: {codec.BACKEND}")
+    for label, content, project in cases:
+        decoded = json.loads(content)
+        projected = project(codec.loads(content))
+        full_size = len(json.dumps(decoded))
+        projected_size = len(json.dumps(projected))
+        print(f"{label}:")
+        print(f"  decode     json {_time(json.loads, content):.2f} ms, "
+              f"{codec.BACKEND} {_time(codec.loads, content):.2f} ms")
+        print(f"  project    {_time(project, decoded):.2f} ms")
+        print(f"  serialize  full {_time(json.dumps, decoded):.2f} ms, "
+              f"projected {_time(json.dumps, projected):.2f} ms")
+        print(f"  size       {full_size} -> {projected_size} bytes "
+              f"({(1 - projected_size / full_size) * 100:.0f}% smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Measures the latency of card name lookups in the local name index.
+
+The local card corpus is used when it has been built (see
+app.tools.card_corpus); otherwise about 30,000 synthetic names are generated.
+
+Run from the repository root:
+
+    python -m benchmarks.name_index_benchmark
+"""
+
+import random
+import time
+
+from app.tools import card_corpus
+from app.tools import card_name_index
+
+_SYLLABLES = ["ka", "lo", "mi", "ra", "the", "ther", "dor", "an", "el", "ix",
+              "gar", "vin", "sha", "tor", "bel", "un", "os", "ri", "ath", "ven"]
+_QUERIES = ["lightnign bolt", "jotun grnt", "aether vail", "delver of secret", "urzas sag"]
+
+
+def _synthetic_names(count: int = 30000) -> list:
+    rng = random.Random(0)
+
+    def word():
+        return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 4))).capitalize()
+
+    names = {"Lightning Bolt", "Jötun Grunt", "Æther Vial", "Urza's Saga",
+             "Delver of Secrets // Insectile Aberration"}
+    while len(names) < count:
+        names.add(" ".join(word() for _ in range(rng.randint(1, 4))))
+    return list(names)
+
+
+def _microseconds(fn, query: str, repeat: int = 500) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(query)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main() -> None:
+    corpus = card_corpus.get_corpus()
+    names = corpus.names() if corpus is not None else _synthetic_names()
+    started = time.perf_counter()
+    index = card_name_index.NameIndex(names)
+    print(f"indexed {len(index)} {'corpus' if corpus else 'synthetic'} names "
+          f"in {time.perf_counter() - started:.2f} s")
+    for query in _QUERIES:
+        print(f"{query!r}: autocomplete {_microseconds(index.autocomplete, query[:4]):.0f} us, "
+              f"fuzzy {_microseconds(index.fuzzy, query):.0f} us -> {index.fuzzy(query)[:1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures how the CPU-bound tool path scales with worker processes.
+
+Each worker repeatedly reads a cached Scryfall search page from the shared
+SQLite response cache, decodes it, projects it onto records and serializes
+the result, which is the per-call CPU work that the GIL limits to one core
+under `adk web`. Throughput is reported for 1, 2, 4, ... workers up to the
+number of cores, together with the efficiency relative to linear scaling.
+
+Run from the repository root:
+
+    python -m benchmarks.worker_scaling_benchmark [--max-workers N]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from app.shared import codec
+from app.shared import disk_cache
+from app.tools import records
+from benchmarks import codec_benchmark
+
+_CALLS_PER_WORKER = 200
+_KEY = "GET /cards/search?q=benchmark"
+
+
+def _work(path: str) -> None:
+    cache = disk_cache.DiskCache(path, "scryfall")
+    for _ in range(_CALLS_PER_WORKER):
+        json.dumps(records.project_scryfall(codec.loads(cache.get(_KEY))))
+
+
+def _throughput(path: str, workers: int) -> float:
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers) as pool:
+        # Warm the pool up so process start-up is not measured.
+        pool.map(abs, range(workers))
+        started = time.perf_counter()
+        pool.map(_work, [path] * workers)
+        elapsed = time.perf_counter() - started
+    return workers * _CALLS_PER_WORKER / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    cores = parser.parse_args().max_workers
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, "responses.db")
+        disk_cache.DiskCache(path, "scryfall").put(_KEY, codec_benchmark._search_page())
+        counts = sorted({1, *[2 ** i for i in range(1, cores.bit_length())], cores})
+        baseline = None
+        print(f"cores: {os.cpu_count()}")
+        for workers in counts:
+            calls_per_second = _throughput(path, workers)
+            baseline = baseline or calls_per_second
+            efficiency = calls_per_second / (baseline * workers)
+            print(f"{workers} worker(s): {calls_per_second:.0f} calls/s "
+                  f"({efficiency * 100:.0f}% of linear)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Tests for app.tools.card_name_index and app.tools.card_corpus."""
+
+import json
+
+from app.tools import card_corpus
+from app.tools import card_name_index
+
+_NAMES = [
+    "Black Lotus",
+    "Lightning Bolt",
+    "Lightning Helix",
+    "Jötun Grunt",
+    "Æther Vial",
+    "Urza's Saga",
+    "Fire // Ice",
+    "Delver of Secrets // Insectile Aberration",
+]
+
+
+def test_normalize():
+    assert card_name_index.normalize("Jötun Grunt") == "jotun grunt"
+    assert card_name_index.normalize("Æther Vial") == "aether vial"
+    assert card_name_index.normalize("Urza's Saga") == "urzas saga"
+    assert card_name_index.normalize("  Ach! Hans, Run! ") == "ach hans run"
+
+
+def test_lookup_matches_normalized_and_face_names():
+    index = card_name_index.NameIndex(_NAMES)
+    assert index.lookup("JOTUN GRUNT") == "Jötun Grunt"
+    assert index.lookup("aether vial") == "Æther Vial"
+    assert index.lookup("Ice") == "Fire // Ice"
+    assert index.lookup("insectile aberration") == "Delver of Secrets // Insectile Aberration"
+    assert index.lookup("Lightning") is None
+
+
+def test_autocomplete_ranks_name_prefixes_before_word_prefixes():
+    index = card_name_index.NameIndex(_NAMES + ["Bolt Bend"])
+    assert index.autocomplete("light") == ["Lightning Bolt", "Lightning Helix"]
+    assert index.autocomplete("bolt") == ["Bolt Bend", "Lightning Bolt"]
+    assert index.autocomplete("l") == []
+    assert len(index.autocomplete("li", limit=1)) == 1
+
+
+def test_fuzzy_tolerates_typos():
+    index = card_name_index.NameIndex(_NAMES)
+    assert index.fuzzy("lightnign bolt")[0][0] == "Lightning Bolt"
+    assert index.fuzzy("aether vail")[0][0] == "Æther Vial"
+    assert index.fuzzy("qqqq") == []
+
+
+def test_resolve():
+    index = card_name_index.NameIndex(_NAMES)
+    assert index.resolve("fire") == "Fire // Ice"
+    assert index.resolve("delver") == "Delver of Secrets // Insectile Aberration"
+    assert index.resolve("urza saga") == "Urza's Saga"
+    assert index.resolve("lightnig bolt") == "Lightning Bolt"
+
+
+def test_resolve_does_not_guess_names_missing_from_the_corpus():
+    index = card_name_index.NameIndex(_NAMES + ["Sol Ring", "Lotus Cobra"])
+    assert index.resolve("Lotus Petal") is None
+    assert index.resolve("Sol Talisman") is None
+    assert index.resolve("Ring of Ma'ruf") is None
+    # Close to two names at once is ambiguous too.
+    assert index.resolve("lightning blot") is None
+
+
+def test_corpus_round_trip(tmp_path):
+    bulk = tmp_path / "oracle_cards.json"
+    cards = [
+        {"object": "card", "name": "Black Lotus", "layout": "normal", "mana_cost": "{0}",
+         "prices": {"usd": "25000.00"}},
+        {"object": "card", "name": "Goblin", "layout": "token"},
+    ]
+    bulk.write_text("[\n" + ",\n".join(json.dumps(card) for card in cards) + "\n]\n")
+    path = str(tmp_path / "cards.db")
+    assert card_corpus.build_corpus(str(bulk), path, updated_at="2025-06-01T09:00:00+00:00") == 1
+    corpus = card_corpus.CardCorpus(path)
+    assert corpus.names() == ["Black Lotus"]
+    assert corpus.updated_at() == "2025-06-01T09:00:00+00:00"
+    card = corpus.get_card("Black Lotus")
+    assert card["mana_cost"] == "{0}"
+    # Prices would be stale; the price store records them instead.
+    assert "prices" not in card
+    assert corpus.get_card("Goblin") is None
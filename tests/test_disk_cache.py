@@ -0,0 +1,79 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Tests for app.shared.disk_cache."""
+
+from app.shared import disk_cache
+from app.shared import resilience
+
+
+def test_get_and_put(tmp_path):
+    cache = disk_cache.DiskCache(str(tmp_path / "responses.db"), "test")
+    assert cache.get("key") is None
+    cache.put("key", b"first")
+    cache.put("key", b"second")
+    assert cache.get("key") == b"second"
+
+
+def test_entries_are_shared_between_instances(tmp_path):
+    path = str(tmp_path / "responses.db")
+    disk_cache.DiskCache(path, "test").put("key", b"value")
+    assert disk_cache.DiskCache(path, "test").get("key") == b"value"
+
+
+def test_table_never_exceeds_max_entries(tmp_path):
+    path = str(tmp_path / "responses.db")
+    writers = [disk_cache.DiskCache(path, "test", max_entries=5) for _ in range(3)]
+    for i in range(30):
+        writers[i % 3].put(f"key{i}", b"value")
+    connection = disk_cache.connect(path)
+    assert connection.execute("SELECT COUNT(*) FROM test").fetchone()[0] == 5
+    assert writers[0].get("key29") == b"value"
+    assert writers[0].get("key0") is None
+
+
+def test_table_never_exceeds_max_bytes(tmp_path):
+    cache = disk_cache.DiskCache(str(tmp_path / "responses.db"), "test", max_bytes=250)
+    for i in range(10):
+        cache.put(f"key{i}", b"x" * 100)
+    assert [cache.get(f"key{i}") is not None for i in range(10)] == [False] * 8 + [True] * 2
+    # The newest entry is kept even when it alone is over the limit.
+    cache.put("big", b"x" * 1000)
+    assert cache.get("big") is not None
+    assert cache.get("key9") is None
+
+
+def test_tables_without_sizes_are_migrated(tmp_path):
+    path = str(tmp_path / "responses.db")
+    connection = disk_cache.connect(path)
+    connection.execute("CREATE TABLE test (key TEXT PRIMARY KEY, content BLOB NOT NULL, updated_at REAL NOT NULL)")
+    connection.execute("INSERT INTO test VALUES ('old', x'0102', 0)")
+    cache = disk_cache.DiskCache(path, "test")
+    assert connection.execute("SELECT size FROM test WHERE key = 'old'").fetchone()[0] == 2
+    cache.put("new", b"value")
+    assert cache.get("old") == b"\x01\x02"
+
+
+def test_response_cache_resolves_cache_dir_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.delenv("ADK_SHARED_CACHE_DIR", raising=False)
+    in_process = disk_cache.response_cache("test")
+    in_process.put("key", b"value")
+    assert isinstance(in_process._cache, resilience.StaleCache)
+
+    shared = disk_cache.response_cache("test")
+    monkeypatch.setenv("ADK_SHARED_CACHE_DIR", str(tmp_path))
+    shared.put("key", b"value")
+    assert isinstance(shared._cache, disk_cache.DiskCache)
+    assert (tmp_path / "responses.db").exists()
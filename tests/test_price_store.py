@@ -0,0 +1,99 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Tests for app.tools.price_store."""
+
+import pytest
+
+from app.tools import price_store
+
+
+def _card(card_id, name, set_code, usd=None, eur=None):
+    return {
+        "id": card_id,
+        "name": name,
+        "set": set_code,
+        "collector_number": card_id,
+        "prices": {"usd": usd, "usd_foil": None, "eur": eur, "tix": None},
+    }
+
+
+@pytest.fixture(params=["numpy", "array"])
+def store(request, tmp_path, monkeypatch):
+    if request.param == "array":
+        monkeypatch.setattr(price_store, "numpy", None)
+    elif price_store.numpy is None:
+        pytest.skip("numpy is not installed")
+    store = price_store.PriceStore(str(tmp_path / "prices"))
+    store.append_snapshot("2025-01-01", [
+        _card("a", "Alpha", "one", usd="2.00"),
+        _card("b", "Beta", "one", usd="10.00"),
+        _card("c", "Gamma", "two", usd="0.10"),
+        _card("d", "Unpriced", "two"),
+    ])
+    store.append_snapshot("2025-01-08", [
+        _card("a", "Alpha", "one", usd="6.00"),
+        _card("b", "Beta", "one", usd="5.00"),
+        _card("c", "Gamma", "two", usd="1.00"),
+        _card("e", "Epsilon", "two", usd="3.00", eur="2.50"),
+    ])
+    return store
+
+
+def test_dates_and_registry_are_append_only(store):
+    assert store.dates() == ["2025-01-01", "2025-01-08"]
+    with open(store._registry_path()) as f:
+        assert [line.split("\t")[0] for line in f] == ["a", "b", "c", "e"]
+
+
+def test_top_movers(store):
+    movers = store.top_movers(days=7)
+    assert (movers["from_date"], movers["to_date"]) == ("2025-01-01", "2025-01-08")
+    # Gamma is below min_price and Epsilon has no earlier price.
+    assert [card["name"] for card in movers["cards"]] == ["Alpha", "Beta"]
+    assert movers["cards"][0]["change_percent"] == 200.0
+    assert [card["name"] for card in store.top_movers(falling=True)["cards"]] == ["Beta", "Alpha"]
+    assert store.top_movers(set_code="TWO", min_price=0)["cards"][0]["name"] == "Gamma"
+    assert "error" in store.top_movers(days=30)
+
+
+def test_top_movers_skip_cards_without_a_starting_price(store):
+    store.append_snapshot("2025-01-15", [_card("a", "Alpha", "one", usd="0.00")])
+    store.append_snapshot("2025-01-22", [_card("a", "Alpha", "one", usd="1.00")])
+    cards = store.top_movers(days=7, min_price=0)["cards"]
+    assert "Alpha" not in [card["name"] for card in cards]
+    assert all(abs(card["change_percent"]) != float("inf") for card in cards)
+
+
+def test_set_summary(store):
+    summary = store.set_summary("one")
+    assert summary["priced_cards"] == 2
+    assert summary["total"] == 11.0
+    assert summary["most_expensive"]["name"] == "Alpha"
+    assert summary["total_change"] == -1.0
+    assert "error" in store.set_summary("nope")
+
+
+def test_card_series(store):
+    series = store.card_series("Epsilon", currency="eur")
+    assert series["dates"] == ["2025-01-01", "2025-01-08"]
+    assert series["printings"][0]["prices"] == [None, 2.5]
+    assert store.card_series("Gamma")["printings"][0]["prices"] == [0.1, 1.0]
+    assert "error" in store.card_series("Nobody")
+
+
+def test_a_new_reader_sees_the_same_data(store):
+    reader = price_store.PriceStore(store.path)
+    assert reader.top_movers()["cards"] == store.top_movers()["cards"]
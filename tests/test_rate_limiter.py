@@ -0,0 +1,70 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Tests for app.shared.rate_limiter."""
+
+import time
+
+from app.shared import rate_limiter
+
+
+def test_burst_is_allowed_then_requests_are_spaced():
+    limiter = rate_limiter.RateLimiter("test", [rate_limiter.Rate(2, 0.2)])
+    started = time.monotonic()
+    assert limiter.acquire()
+    assert limiter.acquire()
+    assert time.monotonic() - started < 0.05
+    assert limiter.acquire()
+    assert time.monotonic() - started >= 0.09
+
+
+def test_acquire_fails_fast_without_taking_a_slot():
+    limiter = rate_limiter.RateLimiter("test", [rate_limiter.Rate(1, 60.0)])
+    assert limiter.acquire(timeout=0)
+    arrivals = list(limiter._arrivals)
+    started = time.monotonic()
+    assert not limiter.acquire(timeout=1.0)
+    assert time.monotonic() - started < 0.05
+    # The rejected request did not push the next slot further out.
+    assert limiter._arrivals == arrivals
+
+
+def test_request_must_fit_every_rate():
+    limiter = rate_limiter.RateLimiter(
+        "test", [rate_limiter.Rate(100, 1.0), rate_limiter.Rate(2, 86400.0)]
+    )
+    assert limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=1.0)
+
+
+def test_shared_limiters_use_one_quota(tmp_path):
+    path = str(tmp_path / "rate_limits.db")
+    rates = [rate_limiter.Rate(2, 60.0)]
+    first = rate_limiter.SharedRateLimiter("test", rates, path)
+    second = rate_limiter.SharedRateLimiter("test", rates, path)
+    assert first.acquire(timeout=0)
+    assert second.acquire(timeout=0)
+    assert not first.acquire(timeout=0)
+    assert not second.acquire(timeout=0)
+
+
+def test_upstream_limiter_resolves_cache_dir_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.delenv("ADK_SHARED_CACHE_DIR", raising=False)
+    limiter = rate_limiter.for_upstream("test", [rate_limiter.Rate(1, 60.0)])
+    monkeypatch.setenv("ADK_SHARED_CACHE_DIR", str(tmp_path))
+    assert limiter.acquire(timeout=0)
+    assert isinstance(limiter._limiter, rate_limiter.SharedRateLimiter)
+    assert (tmp_path / "rate_limits.db").exists()
@@ -0,0 +1,111 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Tests for app.tools.records and app.shared.codec."""
+
+from app.shared import codec
+from app.tools import records
+
+_IMAGES = {size: f"https://img/{size}.jpg" for size in ("small", "normal", "large", "png")}
+
+_CARD = {
+    "object": "card",
+    "id": "c1",
+    "oracle_id": "o1",
+    "multiverse_ids": [1],
+    "mtgo_id": 2,
+    "arena_id": 3,
+    "tcgplayer_id": 4,
+    "cardmarket_id": 5,
+    "name": "Llanowar Elves",
+    "layout": "normal",
+    "mana_cost": "{G}",
+    "cmc": 1.0,
+    "produced_mana": ["G"],
+    "artist": "Kev Walker",
+    "flavor_text": "One bone broken for every twig snapped underfoot.",
+    "image_uris": _IMAGES,
+    "prices": {"usd": "0.25"},
+    "frame": "2015",
+    "purchase_uris": {"tcgplayer": "https://tcgplayer"},
+}
+
+
+def test_codec_round_trip():
+    payload = {"name": "Jötun Grunt", "cmc": 2.0, "colors": ["W"], "reserved": False}
+    assert codec.loads(codec.dumps(payload)) == payload
+    assert codec.loads(codec.dumps(payload).decode("utf-8")) == payload
+
+
+def test_card_projection_keeps_identifiers_and_drops_print_metadata():
+    card = records.project_scryfall(dict(_CARD))
+    for field in ("oracle_id", "multiverse_ids", "mtgo_id", "arena_id", "tcgplayer_id",
+                  "cardmarket_id", "layout", "produced_mana", "artist", "flavor_text"):
+        assert card[field] == _CARD[field]
+    assert card["object"] == "card"
+    assert card["image_uris"] == {"normal": "https://img/normal.jpg"}
+    assert "frame" not in card
+    assert "purchase_uris" not in card
+    assert "loyalty" not in card
+
+
+def test_card_faces_keep_colors_flavor_and_image():
+    card = records.project_scryfall({
+        "object": "card",
+        "name": "Delver of Secrets // Insectile Aberration",
+        "card_faces": [
+            {"object": "card_face", "name": "Delver of Secrets", "colors": ["U"],
+             "flavor_text": "Lost in the lore.", "image_uris": _IMAGES, "artist_id": "a1"},
+            {"object": "card_face", "name": "Insectile Aberration", "colors": ["U"],
+             "power": "3", "toughness": "2"},
+        ],
+    })
+    front, back = card["card_faces"]
+    assert front == {"name": "Delver of Secrets", "colors": ["U"], "flavor_text": "Lost in the lore.",
+                     "image_uris": {"normal": "https://img/normal.jpg"}}
+    assert back == {"name": "Insectile Aberration", "colors": ["U"], "power": "3", "toughness": "2"}
+
+
+def test_lists_sets_and_other_objects():
+    result = records.project_scryfall({
+        "object": "list",
+        "has_more": False,
+        "data": [dict(_CARD), {"object": "set", "code": "mkm", "name": "Murders", "icon_svg_uri": "x"}],
+    })
+    assert result["has_more"] is False
+    assert result["data"][0]["name"] == "Llanowar Elves"
+    assert result["data"][1] == {"object": "set", "code": "mkm", "name": "Murders"}
+    catalog = {"object": "catalog", "data": ["Llanowar Elves"]}
+    assert records.project_scryfall(catalog) is catalog
+
+
+def test_time_series_projection():
+    payload = {
+        "Meta Data": {"2. Symbol": "ABC"},
+        records.TIME_SERIES_KEY: {
+            "2024-01-03": {"1. open": "2.0", "4. close": "2.5", "6. volume": "20"},
+            "2024-01-02": {"1. open": "1.0", "4. close": "1.5", "6. volume": "10"},
+        },
+    }
+    result = records.project_time_series(payload)
+    assert result["Meta Data"] == {"2. Symbol": "ABC"}
+    bars = result["bars"]
+    assert bars["date"] == ["2024-01-02", "2024-01-03"]
+    assert bars["open"] == [1.0, 2.0]
+    assert bars["volume"] == [10, 20]
+    # Missing labels become None instead of failing the whole series.
+    assert bars["high"] == [None, None]
+    note = {"Note": "Thank you for using Alpha Vantage!"}
+    assert records.project_time_series(note) is note
@@ -0,0 +1,182 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Tests for app.shared.resilience and the tools' use of it."""
+
+import threading
+import time
+import types
+
+import pytest
+
+from app.shared import metrics
+from app.shared import resilience
+from app.tools import stock_tool
+
+
+def _caller(**kwargs):
+    kwargs.setdefault("backoff_base", 0.001)
+    return resilience.ResilientCaller(resilience.EndpointPolicy("test", **kwargs))
+
+
+def test_backoff_delay_is_capped():
+    for attempt in range(10):
+        assert 0 <= resilience.backoff_delay(attempt, 0.1, 0.5) <= 0.5
+
+
+def test_breaker_opens_and_half_open_allows_one_trial():
+    breaker = resilience.CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    # The trial is in flight: the breaker stays half-open but admits nobody.
+    assert breaker.state == resilience.HALF_OPEN
+    assert metrics.snapshot()["gauges"]["circuit_breaker_state{test}"] == resilience.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == resilience.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens_and_released_trial_can_be_retaken():
+    breaker = resilience.CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+
+
+def test_retryable_statuses_are_retried():
+    responses = iter([(503, b"busy"), (200, b"ok")])
+    assert _caller().call(lambda timeout: next(responses)) == (200, b"ok")
+
+
+def test_persistent_retryable_status_raises_and_counts_as_failure():
+    caller = _caller(max_attempts=2, failure_threshold=1)
+    with pytest.raises(resilience.UpstreamStatusError) as error:
+        caller.call(lambda timeout: (429, b"slow down"))
+    assert error.value.status == 429
+    assert caller.breaker.state == resilience.OPEN
+    with pytest.raises(resilience.CircuitOpenError):
+        caller.call(lambda timeout: (200, b"ok"))
+
+
+def test_slow_requests_are_hedged():
+    calls = []
+
+    def fetch(timeout):
+        calls.append(timeout)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return 200, b"slow"
+        return 200, b"fast"
+
+    caller = _caller(deadline=2.0)
+    caller.latency = resilience.LatencyTracker(default=0.05)
+    assert caller.call(fetch) == (200, b"fast")
+    assert len(calls) == 2
+
+
+def test_hedging_can_be_turned_off():
+    calls = []
+
+    def fetch(timeout):
+        calls.append(timeout)
+        time.sleep(0.2)
+        return 200, b"slow"
+
+    caller = _caller(deadline=2.0, hedge=False)
+    caller.latency = resilience.LatencyTracker(default=0.05)
+    assert caller.call(fetch) == (200, b"slow")
+    assert len(calls) == 1
+    assert stock_tool._caller.policy.hedge is False
+
+
+def test_deadline_is_enforced():
+    caller = _caller(deadline=0.1, hedge_min_delay=1.0)
+    started = time.monotonic()
+    with pytest.raises(resilience.DeadlineExceededError):
+        caller.call(lambda timeout: time.sleep(0.5) or (200, b"late"))
+    assert time.monotonic() - started < 0.4
+
+
+def test_rate_limited_calls_do_not_trip_the_breaker():
+    limiter = types.SimpleNamespace(acquire=lambda timeout: False)
+    caller = resilience.ResilientCaller(
+        resilience.EndpointPolicy("test", failure_threshold=1), rate_limiter=limiter
+    )
+    with pytest.raises(resilience.RateLimitedError):
+        caller.call(lambda timeout: (200, b"ok"))
+    assert caller.breaker.state == resilience.CLOSED
+
+
+def test_each_upstream_has_its_own_bounded_pool():
+    slow = _caller(max_in_flight=1, hedge_min_delay=1.0)
+    fast = _caller(max_in_flight=1)
+    assert slow._executor is not fast._executor
+    release = threading.Event()
+    blocker = threading.Thread(target=slow.call, args=(lambda timeout: release.wait() and (200, b"ok"),))
+    blocker.start()
+    try:
+        # The slow upstream's only thread is busy; the other upstream is not affected.
+        assert fast.call(lambda timeout: (200, b"ok")) == (200, b"ok")
+        with pytest.raises(resilience.DeadlineExceededError):
+            slow._attempt(lambda timeout: (200, b"ok"), time.monotonic() + 0.05, idempotent=False)
+    finally:
+        release.set()
+        blocker.join()
+
+
+def test_alpha_vantage_throttling_is_detected():
+    assert stock_tool._is_throttled(b'{"Note": "Thank you for using Alpha Vantage!"}')
+    assert stock_tool._is_throttled(b'{"Information": "Rate limit reached."}')
+    assert not stock_tool._is_throttled(b'{"Meta Data": {}, "Note": "x"}')
+    assert not stock_tool._is_throttled(b"not json")
+
+
+def test_throttled_and_failing_upstreams_fall_back_to_stale_responses(monkeypatch):
+    responses = [(200, b'{"feed": [1]}')]
+
+    class _Http:
+        def __init__(self, timeout):
+            pass
+
+        def request(self, **kwargs):
+            status, content = responses[-1]
+            return types.SimpleNamespace(status=status), content
+
+    monkeypatch.setattr(stock_tool, "Http", _Http)
+    monkeypatch.setattr(stock_tool, "_stale_cache", resilience.StaleCache())
+    monkeypatch.setattr(stock_tool, "_caller", resilience.ResilientCaller(
+        resilience.EndpointPolicy("alphavantage_test", max_attempts=1)
+    ))
+    assert stock_tool._alpha_vantage_query({"function": "NEWS_SENTIMENT"}) == {"feed": [1]}
+
+    responses.append((200, b'{"Note": "Thank you for using Alpha Vantage!"}'))
+    result = stock_tool._alpha_vantage_query({"function": "NEWS_SENTIMENT"})
+    assert result["feed"] == [1]
+    assert "warning" in result
+
+    responses.append((503, b'{"message": "unavailable"}'))
+    assert stock_tool._alpha_vantage_query({"function": "NEWS_SENTIMENT"})["feed"] == [1]
+    assert "error" in stock_tool._alpha_vantage_query({"function": "OTHER"})
@@ -0,0 +1,158 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Tests for app.shared.session_memory."""
+
+import types
+
+import pytest
+
+from app.shared import metrics
+from app.shared import session_memory
+
+
+class _Part:
+    def __init__(self, response):
+        self.function_response = types.SimpleNamespace(response=response)
+
+    def model_dump(self, exclude_none=False):
+        return {"function_response": {"response": self.function_response.response}}
+
+
+class _Content:
+    def __init__(self, parts):
+        self.parts = parts
+
+    def model_dump(self, exclude_none=False):
+        return {"parts": [part.model_dump() for part in self.parts]}
+
+
+def _context(session_id="s1", state=None):
+    return types.SimpleNamespace(
+        state={} if state is None else state,
+        agent_name="magic_agent",
+        _invocation_context=types.SimpleNamespace(session=types.SimpleNamespace(id=session_id)),
+    )
+
+
+def _tool(name):
+    return types.SimpleNamespace(name=name)
+
+
+def _call(tool_name, args, context, result):
+    """Runs a tool call through the callbacks as the ADK runner does."""
+    tool = _tool(tool_name)
+    response = session_memory.before_tool_callback(tool=tool, args=args, tool_context=context)
+    if response is None:
+        response = result
+    altered = session_memory.after_tool_callback(
+        tool=tool, args=args, tool_context=context, tool_response=response
+    )
+    return altered if altered is not None else response
+
+
+@pytest.fixture(autouse=True)
+def _fresh_memory(monkeypatch):
+    monkeypatch.delenv("ADK_SHARED_CACHE_DIR", raising=False)
+    monkeypatch.setattr(session_memory, "memory", session_memory.SessionMemory())
+    metrics.reset()
+
+
+def test_results_are_tagged_and_repeated_calls_are_references():
+    context = _context()
+    first = _call("search_cards", {"query": "bolt"}, context, {"total_cards": 2})
+    handle = first.pop("result_handle")
+    assert first == {"total_cards": 2}
+    second = _call("search_cards", {"query": "bolt"}, context, {"total_cards": 3})
+    assert second["result_handle"] == handle
+    assert "total_cards" not in second
+    third = _call("search_cards", {"query": "helix"}, context, {"total_cards": 1})
+    assert third["result_handle"] not in (handle, None)
+    assert metrics.snapshot()["counters"]["session_memory_hits{search_cards}"] == 1
+
+
+def test_sessions_and_unmemoized_tools_are_not_replayed():
+    _call("search_cards", {"query": "bolt"}, _context("s1"), {"total_cards": 2})
+    assert _call("search_cards", {"query": "bolt"}, _context("s2"), {"total_cards": 2})["total_cards"] == 2
+    context = _context()
+    _call("get_random_card", {}, context, {"name": "Black Lotus"})
+    assert _call("get_random_card", {}, context, {"name": "Mox Pearl"})["name"] == "Mox Pearl"
+
+
+def test_sub_agents_get_the_data_of_calls_made_in_other_sessions():
+    first_child = _context("child1", state={"session_memory_scope": "root"})
+    handle = _call("search_cards", {"query": "bolt"}, first_child, {"total_cards": 2})["result_handle"]
+    # AgentTool starts each delegation in a new session with a copy of the
+    # caller's state, so the store is shared but the earlier copy is not
+    # visible to the new sub-agent session.
+    second_child = _context("child2", state={"session_memory_scope": "root"})
+    replay = _call("search_cards", {"query": "bolt"}, second_child, {"total_cards": 3})
+    assert replay == {"total_cards": 2, "result_handle": handle}
+    assert metrics.snapshot()["counters"]["session_memory_hits{search_cards}"] == 1
+    # Within the same sub-agent session a reference is enough.
+    assert "total_cards" not in _call("search_cards", {"query": "bolt"}, second_child, {})
+
+
+def test_errors_are_not_stored():
+    context = _context()
+    _call("search_cards", {"query": "x"}, context, {"error": "boom"})
+    assert _call("search_cards", {"query": "x"}, context, {"total_cards": 1})["total_cards"] == 1
+
+
+def test_old_large_results_are_compacted(monkeypatch):
+    monkeypatch.setattr(session_memory.constants, "CONTEXT_TOKEN_BUDGET", 3000)
+    monkeypatch.setattr(session_memory.constants, "LARGE_RESULT_TOKENS", 100)
+    context = _context()
+    page = {"total_cards": 50, "data": [{"name": f"Card {i}", "oracle_text": "x" * 150} for i in range(50)]}
+    old = _call("search_cards", {"query": "a"}, context, dict(page))
+    new = _call("search_cards", {"query": "b"}, context, dict(page))
+    small = _call("search_cards", {"query": "c"}, context, {"total_cards": 0})
+    request = types.SimpleNamespace(contents=[_Content([_Part(old)]), _Content([_Part(new)]), _Content([_Part(small)])])
+
+    assert session_memory.before_model_callback(callback_context=context, llm_request=request) is None
+
+    compacted = request.contents[0].parts[0].function_response.response
+    assert compacted["compacted"] is True
+    assert compacted["result_handle"] == old["result_handle"]
+    assert compacted["summary"]["total_cards"] == 50
+    assert compacted["summary"]["data"] == {"count": 50, "first_names": [f"Card {i}" for i in range(5)]}
+    assert request.contents[1].parts[0].function_response.response is new
+    assert session_memory.memory.get(context.state["session_memory_scope"], old["result_handle"]) == page
+    gauges = metrics.snapshot()["gauges"]
+    assert 0 < gauges["context_tokens{magic_agent}"] < session_memory.estimate_tokens(page) * 2
+    # The compacted result is no longer in the conversation, so a repeated
+    # call inlines it again.
+    assert _call("search_cards", {"query": "a"}, context, {})["data"] == page["data"]
+
+
+def test_store_evicts_oldest_beyond_budget():
+    store = session_memory.SessionStore(token_budget=100)
+    first = store.put("a", {"text": "x" * 200})
+    store.put("b", {"text": "y" * 200})
+    assert store.get(first.handle) is None
+    assert store.find("a", max_age=60) is None
+    assert store.find("b", max_age=60) is not None
+
+
+def test_results_are_shared_between_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv("ADK_SHARED_CACHE_DIR", str(tmp_path))
+    context = _context()
+    handle = _call("search_cards", {"query": "bolt"}, context, {"total_cards": 2})["result_handle"]
+    scope = context.state["session_memory_scope"]
+    other_worker = session_memory.SessionMemory()
+    assert other_worker.get(scope, handle) == {"total_cards": 2}
+    # Handles are random, so one that was never stored is simply not found.
+    assert other_worker.get(scope, "r1") is None
+    assert other_worker.get("other session", handle) is None
@@ -0,0 +1,147 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Tests for app.shared.single_flight."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.shared import single_flight
+
+
+def test_normalize_params_and_key():
+    params = single_flight.normalize_params({"q": " bolt ", "page": None, "exact": "x"})
+    assert params == {"exact": "x", "q": "bolt"}
+    assert list(params) == ["exact", "q"]
+    assert single_flight.normalize_key("GET", "/cards", params={"q": "bolt ", "a": 1}) == (
+        single_flight.normalize_key("GET", "/cards", params={"a": 1, "q": "bolt"})
+    )
+    assert single_flight.normalize_key("POST", body={"b": 1, "a": 2}) == 'POST {"a":2,"b":1}'
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = single_flight.SingleFlight("test")
+    calls = []
+    started = threading.Event()
+
+    def fn():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", fn)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", fn))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join()
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+    assert flight.waiter_counts() == {"k": 3}
+    # Nothing is cached once the call is done.
+    assert flight.do("k", lambda: "again") == "again"
+
+
+def test_errors_are_shared():
+    flight = single_flight.SingleFlight("test")
+    started = threading.Event()
+
+    def fn():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    errors = []
+
+    def run():
+        try:
+            flight.do("k", fn)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=run)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=run)
+    follower.start()
+    leader.join()
+    follower.join()
+    assert len(errors) == 2
+
+
+def test_async_calls_share_one_execution():
+    flight = single_flight.SingleFlight("test")
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("k", fn) for _ in range(4)))
+
+    assert asyncio.run(main()) == ["result"] * 4
+    assert len(calls) == 1
+
+
+def test_async_leader_cancellation_elects_a_new_leader():
+    flight = single_flight.SingleFlight("test")
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("k", fn))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do_async("k", fn)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(main()) == ["result"] * 3
+    assert len(calls) == 2
+
+
+def test_async_follower_cancellation_does_not_affect_the_leader():
+    flight = single_flight.SingleFlight("test")
+
+    async def fn():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("k", fn))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do_async("k", fn))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(main()) == "result"